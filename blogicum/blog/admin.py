@@ -50,7 +50,8 @@ class PostAdmin(admin.ModelAdmin):
         'location',
         'pub_date',
         'category',
-        'is_published'
+        'is_published',
+        'comment_count',
     ]
     list_editable = [
         'text',
@@ -0,0 +1,38 @@
+"""
+SQLite с выбором режима транзакций, как OPTIONS['transaction_mode']
+в Django 5.1.
+
+Транзакция BEGIN DEFERRED, начатая чтением, не может дождаться
+блокировки записи: если другой процесс успел записать, SQLite сразу
+отвечает «database is locked», и busy_timeout не помогает.
+BEGIN IMMEDIATE берёт блокировку записи в начале транзакции
+и ждёт её busy_timeout, поэтому годится для любого кода, пишущего
+в БД, а не только для представлений блога.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = {'DEFERRED', 'IMMEDIATE', 'EXCLUSIVE'}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    transaction_mode = None
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        transaction_mode = params.pop('transaction_mode', None)
+        if transaction_mode is not None:
+            transaction_mode = transaction_mode.upper()
+            if transaction_mode not in TRANSACTION_MODES:
+                raise ImproperlyConfigured(
+                    'transaction_mode должен быть одним из: '
+                    + ', '.join(sorted(TRANSACTION_MODES))
+                )
+        self.transaction_mode = transaction_mode
+        return params
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode is None:
+            super()._start_transaction_under_autocommit()
+        else:
+            self.cursor().execute(f'BEGIN {self.transaction_mode}')
@@ -0,0 +1,28 @@
+import time
+
+from django.core.cache import cache
+
+
+def _initial_version() -> int:
+    # Ключ версии мог быть вытеснен из кеша: новая версия не должна
+    # совпасть ни с одной из выданных раньше.
+    return int(time.time() * 1000)
+
+
+def get_versions(keys) -> dict:
+    """Текущие версии для набора ключей, недостающие создаются."""
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _initial_version(), None)
+            versions[key] = cache.get(key, 0)
+    return versions
+
+
+def bump_versions(keys):
+    """Увеличивает версии: всё, что от них зависит, устаревает."""
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, _initial_version(), None)
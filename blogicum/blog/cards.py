@@ -0,0 +1,105 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .cache import get_versions
+from .routers import read_from_replica
+
+CARD_TEMPLATE = 'includes/post_card.html'
+CARD_HITS_KEY = 'blog:card:hits'
+CARD_MISSES_KEY = 'blog:card:misses'
+# Общая версия всех карточек: её увеличивает refresh_replicas.
+CARDS_VERSION_KEY = 'blog:version:cards'
+
+
+def post_version_key(post_id):
+    return f'blog:version:post:{post_id}'
+
+
+def category_version_key(category_id):
+    return f'blog:version:category:{category_id}'
+
+
+def location_version_key(location_id):
+    return f'blog:version:location:{location_id}'
+
+
+def user_version_key(user_id):
+    return f'blog:version:user:{user_id}'
+
+
+def post_card_version_keys(post):
+    return [
+        CARDS_VERSION_KEY,
+        post_version_key(post.pk),
+        category_version_key(post.category_id),
+        location_version_key(post.location_id),
+        user_version_key(post.author_id),
+    ]
+
+
+def _count(key, value):
+    if value:
+        if not cache.add(key, value, None):
+            try:
+                cache.incr(key, value)
+            except ValueError:
+                cache.set(key, value, None)
+
+
+def render_post_cards(posts):
+    """
+    HTML карточек постов из кеша фрагментов.
+    Ключ карточки собран из версий поста, его категории, местоположения
+    и автора, из времени правки поста и числа комментариев: сигналы
+    увеличивают версии при изменении этих объектов, и карточка
+    перерисовывается. Время правки и счётчик берутся из самой строки:
+    версии читаются уже после неё, и пост, сохранённый между чтениями,
+    иначе попал бы в кеш старым под новой версией.
+    """
+    posts = list(posts)
+    versions = get_versions(list({
+        key for post in posts for key in post_card_version_keys(post)
+    }))
+    card_keys = [
+        'blog:card:{}:{}:{}:{}'.format(
+            post.pk,
+            post.updated_at.timestamp(),
+            post.comment_count,
+            '.'.join(
+                str(versions[key]) for key in post_card_version_keys(post)
+            ),
+        )
+        for post in posts
+    ]
+    cached = cache.get_many(card_keys)
+    cards = []
+    missed = {}
+    for post, key in zip(posts, card_keys):
+        card = cached.get(key)
+        if card is None:
+            card = render_to_string(CARD_TEMPLATE, {'post': post})
+            missed[key] = card
+        cards.append(mark_safe(card))
+    if missed and not read_from_replica():
+        cache.set_many(
+            missed,
+            getattr(settings, 'BLOG_CARD_CACHE_TIMEOUT', 60 * 60 * 24),
+        )
+    _count(CARD_HITS_KEY, len(posts) - len(missed))
+    _count(CARD_MISSES_KEY, len(missed))
+    return cards
+
+
+def card_cache_stats():
+    """Счётчики попаданий и промахов кеша карточек."""
+    stats = cache.get_many([CARD_HITS_KEY, CARD_MISSES_KEY])
+    return {
+        'hits': stats.get(CARD_HITS_KEY, 0),
+        'misses': stats.get(CARD_MISSES_KEY, 0),
+    }
+
+
+def reset_card_cache_stats():
+    cache.delete_many([CARD_HITS_KEY, CARD_MISSES_KEY])
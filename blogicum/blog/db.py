@@ -0,0 +1,59 @@
+"""
+Настройка SQLite для боевого режима.
+
+Каждое новое соединение получает PRAGMA из настройки BLOG_SQLITE_PRAGMAS
+(WAL, mmap, synchronous, busy_timeout). От ошибок «database is locked»
+защищают busy_timeout и транзакции BEGIN IMMEDIATE (движок
+blog.backends.sqlite3): так ждёт блокировку любой пишущий код —
+админка, вход, сессии, команды.
+
+Представления блога, которые пишут, вдобавок выстраиваются в очередь
+на файловой блокировке BLOG_SQLITE_WRITE_LOCK: ожидание flock не
+ограничено busy_timeout, и пики записи не заканчиваются ошибкой.
+"""
+import contextlib
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def sqlite_pragmas():
+    return getattr(settings, 'BLOG_SQLITE_PRAGMAS', {})
+
+
+def apply_pragmas(cursor, pragmas):
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Обработчик connection_created: PRAGMA для нового соединения."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = sqlite_pragmas()
+    if pragmas:
+        with connection.cursor() as cursor:
+            apply_pragmas(cursor, pragmas)
+
+
+@contextlib.contextmanager
+def single_writer(path=None):
+    """
+    Эксклюзивная блокировка записи, общая для всех процессов.
+    Без пути в настройках или без fcntl (Windows) ничего не делает.
+    """
+    if path is None:
+        path = getattr(settings, 'BLOG_SQLITE_WRITE_LOCK', None)
+    if not path or fcntl is None:
+        yield
+        return
+    with open(path, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
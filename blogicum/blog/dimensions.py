@@ -0,0 +1,101 @@
+"""
+Справочники в памяти процесса: категории и местоположения.
+
+Таблицы маленькие и меняются редко, поэтому процесс держит их целиком.
+Сигналы сохранения и удаления после фиксации транзакции увеличивают
+общую версию в кеше Django, и каждый процесс перечитывает справочники,
+заметив новую версию. Снимок живёт не дольше BLOG_DIMENSIONS_MAX_AGE
+секунд: если процесс успел перечитать справочники между сохранением
+и версией, устаревший снимок всё равно обновится.
+"""
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.db.models.query import ModelIterable
+
+from .cache import bump_versions, get_versions
+from .routers import primary_reads
+
+DIMENSIONS_VERSION_KEY = 'blog:version:dimensions'
+
+_lock = threading.Lock()
+_loaded = {'version': None, 'dimensions': None, 'loaded_at': 0.0}
+
+
+class Dimensions:
+    """Снимок справочников с доступом по id и slug."""
+
+    def __init__(self, categories, locations):
+        self.categories = {category.pk: category for category in categories}
+        self.categories_by_slug = {
+            category.slug: category for category in categories
+        }
+        self.locations = {location.pk: location for location in locations}
+        self.published_category_ids = [
+            category.pk for category in categories if category.is_published
+        ]
+
+    def category(self, pk):
+        category = self.categories.get(pk)
+        return copy.copy(category) if category is not None else None
+
+    def category_by_slug(self, slug):
+        category = self.categories_by_slug.get(slug)
+        return copy.copy(category) if category is not None else None
+
+    def location(self, pk):
+        location = self.locations.get(pk)
+        return copy.copy(location) if location is not None else None
+
+    def attach(self, post):
+        """Подставляет посту категорию и местоположение из памяти."""
+        post._meta.get_field('category').set_cached_value(
+            post, self.category(post.category_id)
+        )
+        post._meta.get_field('location').set_cached_value(
+            post, self.location(post.location_id)
+        )
+
+
+def get_dimensions() -> Dimensions:
+    """Актуальный снимок справочников."""
+    from .models import Category, Location
+
+    version = get_versions([DIMENSIONS_VERSION_KEY])[DIMENSIONS_VERSION_KEY]
+    max_age = getattr(settings, 'BLOG_DIMENSIONS_MAX_AGE', 300)
+
+    def stale():
+        return (
+            _loaded['version'] != version
+            or time.monotonic() - _loaded['loaded_at'] > max_age
+        )
+
+    if stale():
+        with _lock:
+            if stale():
+                with primary_reads():
+                    _loaded['dimensions'] = Dimensions(
+                        list(Category.objects.all()),
+                        list(Location.objects.all()),
+                    )
+                _loaded['version'] = version
+                _loaded['loaded_at'] = time.monotonic()
+    return _loaded['dimensions']
+
+
+def reset_dimensions():
+    """Справочники изменились: всем процессам пора их перечитать."""
+    _loaded['version'] = None
+    bump_versions([DIMENSIONS_VERSION_KEY])
+
+
+class DimensionsIterable(ModelIterable):
+    """Выдаёт посты с категорией и местоположением из памяти процесса."""
+
+    def __iter__(self):
+        dimensions = get_dimensions()
+        for post in super().__iter__():
+            dimensions.attach(post)
+            yield post
@@ -0,0 +1,81 @@
+"""
+Потоковые чтение и запись выгрузок данных блога.
+
+Выгрузка — массив JSON, как у dumpdata, или записи подряд, по одной
+на строке (JSON Lines). Файл с расширением .gz сжат gzip. При чтении
+файл читается кусками, каждая запись разбирается JSONDecoder.raw_decode,
+как только целиком оказалась в буфере, поэтому память не зависит
+от размера выгрузки.
+"""
+import datetime
+import gzip
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+READ_SIZE: int = 64 * 1024
+
+# Разделители между записями: пробелы, скобки массива и запятые.
+SEPARATORS = ' \t\r\n[],'
+
+
+class DumpError(ValueError):
+    """Выгрузка повреждена или записана не в том формате."""
+
+
+class DumpEncoder(DjangoJSONEncoder):
+    """
+    DjangoJSONEncoder без усечения времени до миллисекунд: выгрузка
+    должна загружаться обратно без потерь.
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            value = o.isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return super().default(o)
+
+
+def open_dump(path, mode='r'):
+    """Открывает выгрузку как текст, сжатую — через gzip."""
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def write_record(stream, record):
+    """Дописывает запись строкой JSON Lines."""
+    stream.write(json.dumps(
+        record, cls=DumpEncoder, ensure_ascii=False
+    ))
+    stream.write('\n')
+
+
+def iter_records(stream, read_size=READ_SIZE):
+    """Выдаёт записи выгрузки из текстового потока по одной."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    exhausted = False
+    while True:
+        while position < len(buffer) and buffer[position] in SEPARATORS:
+            position += 1
+        if position < len(buffer):
+            if buffer[position] != '{':
+                raise DumpError(
+                    f'Ожидалась запись JSON, найдено {buffer[position]!r}.'
+                )
+            try:
+                record, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as error:
+                if exhausted:
+                    raise DumpError(f'Запись повреждена: {error}.') from None
+            else:
+                yield record
+                continue
+        elif exhausted:
+            return
+        chunk = stream.read(read_size)
+        exhausted = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
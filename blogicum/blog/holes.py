@@ -0,0 +1,108 @@
+"""
+Персональные участки («дыры») в общих для всех страницах.
+
+В режиме пробивки страница рендерится без данных пользователя: вместо
+шапки, формы комментария и ссылок автора в неё попадают метки
+<!--hole:имя:аргументы-->. Такое тело можно кешировать одно на всех,
+а метки дешево заполняются под пользователя после чтения из кеша.
+"""
+import re
+
+from django.contrib.auth.models import AnonymousUser
+from django.template.loader import get_template
+from django.utils.html import escape
+
+from .forms import CommentForm
+
+HOLE_RE = re.compile(r'<!--hole:(\w+):([^<>]*?)-->')
+
+fillers = {}
+
+
+def register_hole(name):
+    """Регистрирует функцию, заполняющую дыру с этим именем."""
+    def decorator(func):
+        fillers[name] = func
+        return func
+    return decorator
+
+
+def punching_holes(request) -> bool:
+    return getattr(request, 'punch_holes', False)
+
+
+def hole_marker(name, args) -> str:
+    return f'<!--hole:{name}:{":".join(args)}-->'
+
+
+def render_hole(name, request, args, user=None) -> str:
+    """HTML дыры для пользователя запроса."""
+    if user is None:
+        user = getattr(request, 'user', None) or AnonymousUser()
+    return fillers[name](user, request, *args)
+
+
+def fill_holes(content: str, request, names=None) -> str:
+    """
+    Заполняет метки страницы под пользователя запроса.
+    Если задан `names`, остальные метки остаются на месте.
+    """
+    def fill(match):
+        if names is not None and match.group(1) not in names:
+            return match.group(0)
+        return render_hole(
+            match.group(1),
+            request,
+            match.group(2).split(':') if match.group(2) else [],
+        )
+
+    return HOLE_RE.sub(fill, content)
+
+
+@register_hole('header_user')
+def header_user(user, request):
+    return get_template('includes/holes/header_user.html').render(
+        {'user': user}
+    )
+
+
+@register_hole('request_url')
+def request_url(user, request):
+    return escape(request.build_absolute_uri())
+
+
+@register_hole('post_actions')
+def post_actions(user, request, post_id, author_id):
+    if str(user.pk) != author_id:
+        return ''
+    return get_template('includes/holes/post_actions.html').render(
+        {'post_id': post_id}
+    )
+
+
+@register_hole('comment_actions')
+def comment_actions(user, request, post_id, comment_id, author_id):
+    if str(user.pk) != author_id:
+        return ''
+    return get_template('includes/holes/comment_actions.html').render(
+        {'post_id': post_id, 'comment_id': comment_id}
+    )
+
+
+@register_hole('comment_form')
+def comment_form(user, request, post_id):
+    if not user.is_authenticated:
+        return ''
+    return get_template('includes/holes/comment_form.html').render(
+        {'form': CommentForm(), 'post_id': post_id},
+        request,
+    )
+
+
+@register_hole('profile_actions')
+def profile_actions(user, request, profile_id):
+    if str(user.pk) != profile_id:
+        return ''
+    return get_template('includes/holes/profile_actions.html').render(
+        {'user': user}
+    )
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import bump_versions
+from blog.cards import CARDS_VERSION_KEY
+from blog.models import Post
+from blog.pagecache import FEED_VERSION_KEY
+
+BATCH_SIZE: int = 500
+
+
+class Command(BaseCommand):
+    """Заполнение отрывков текста у существующих публикаций."""
+    help = 'Пересчитывает Post.excerpt пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько публикаций обновлять за один запрос.',
+        )
+
+    def handle(self, *args, batch_size, **options):
+        last_id = 0
+        updated = 0
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_id).order_by('pk').only(
+                    'pk', 'text', 'excerpt'
+                )[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].pk
+            for post in batch:
+                post.update_excerpt()
+            Post.objects.bulk_update(batch, ['excerpt'])
+            updated += len(batch)
+        # bulk_update не отправляет сигналов: закешированные карточки
+        # и страницы с пустыми отрывками сбрасываем разом.
+        if updated:
+            bump_versions([FEED_VERSION_KEY, CARDS_VERSION_KEY])
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено отрывков: {updated}.'
+        ))
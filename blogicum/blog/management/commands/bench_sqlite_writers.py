@@ -0,0 +1,219 @@
+import logging
+import math
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.utils import load_backend
+from django.test import Client, override_settings
+from django.utils import timezone
+
+PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,
+}
+
+# Режим: PRAGMA, режим транзакций, файловая блокировка представлений.
+MODES = {
+    'default': ({}, None, False),
+    'pragmas': (PRODUCTION_PRAGMAS, None, False),
+    'pragmas+immediate': (PRODUCTION_PRAGMAS, 'IMMEDIATE', False),
+    'production': (PRODUCTION_PRAGMAS, 'IMMEDIATE', True),
+}
+
+PASSWORD = 'bench-password'
+
+WRITERS = ('comment', 'login', 'admin')
+
+
+def use_database(settings_dict):
+    """Подменяет соединение default соединением с другим движком и файлом."""
+    connections['default'].close()
+    backend = load_backend(settings_dict['ENGINE'])
+    connections['default'] = backend.DatabaseWrapper(settings_dict, 'default')
+
+
+def create_database(settings_dict):
+    """Файл БД со схемой блога, суперпользователем и постом."""
+    from blog.models import Category, Post
+
+    use_database(settings_dict)
+    call_command('migrate', verbosity=0)
+    user = get_user_model().objects.create_superuser(
+        'bench', password=PASSWORD
+    )
+    post = Post.objects.create(
+        title='Пост',
+        text='Текст',
+        author=user,
+        category=Category.objects.create(
+            title='Категория', slug='bench', description='Описание'
+        ),
+        pub_date=timezone.now(),
+    )
+    connections['default'].close()
+    return post
+
+
+def write(kind, client, post, number):
+    """
+    Одна запись через настоящий код сайта:
+    comment — CommentCreateView, запись в автокоммите;
+    login — вход, пишет last_login и сессию мимо представлений блога;
+    admin — форма категории в админке, транзакция читает и затем пишет.
+    """
+    if kind == 'comment':
+        response = client.post(
+            f'/posts/{post.pk}/comment/',
+            {'text': f'Комментарий {os.getpid()}-{number}'},
+        )
+        return response.status_code == 302
+    if kind == 'admin':
+        response = client.post(
+            f'/admin/blog/category/{post.category_id}/change/',
+            {
+                'title': f'Категория {number}',
+                'description': 'Описание',
+                'slug': 'bench',
+                'is_published': 'on',
+            },
+        )
+        return response.status_code == 302
+    return client.login(username='bench', password=PASSWORD)
+
+
+def run_writer(kind, post, writes, start, results):
+    # Ошибки записи считаются ниже, трассировки в журнале не нужны.
+    logging.getLogger('django.request').disabled = True
+    client = Client(HTTP_HOST='localhost')
+    if kind != 'login':
+        client.login(username='bench', password=PASSWORD)
+    start.wait()
+    latencies = []
+    for number in range(writes):
+        started = time.perf_counter()
+        try:
+            succeeded = write(kind, client, post, number)
+        except Exception:
+            succeeded = False
+        # Неудачная запись так и не завершилась: в процентилях она
+        # считается бесконечно долгой.
+        latencies.append(
+            time.perf_counter() - started if succeeded else math.inf
+        )
+    connections.close_all()
+    results.put((kind, latencies))
+
+
+def percentile(latencies, share):
+    value = latencies[max(math.ceil(len(latencies) * share) - 1, 0)]
+    return '∞' if math.isinf(value) else f'{value * 1000:.1f} мс'
+
+
+class Command(BaseCommand):
+    """Нагрузочный тест параллельной записи в SQLite."""
+    help = (
+        'Пишет в SQLite из нескольких процессов через настоящий код '
+        'сайта: комментарии, вход и правку категории в админке. '
+        'Сравнивает ошибки и задержки без '
+        'настроек, с PRAGMA, с BEGIN IMMEDIATE и в боевом режиме '
+        'с файловой блокировкой.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=9)
+        parser.add_argument('--writes', type=int, default=100)
+        parser.add_argument(
+            '--mode',
+            choices=list(MODES),
+            action='append',
+            help='Режим; по умолчанию все.',
+        )
+
+    def handle(self, *args, workers, writes, mode, **options):
+        context = multiprocessing.get_context('fork')
+        original = connections['default']
+        base_settings = {
+            **original.settings_dict,
+            'ENGINE': 'blog.backends.sqlite3',
+            'OPTIONS': {},
+        }
+        try:
+            with tempfile.TemporaryDirectory() as directory, \
+                    override_settings(PASSWORD_HASHERS=[
+                        'django.contrib.auth.hashers.MD5PasswordHasher',
+                    ]):
+                template = os.path.join(directory, 'template.sqlite3')
+                post = create_database({
+                    **base_settings, 'NAME': template,
+                })
+                for name in mode or MODES:
+                    self.bench(
+                        context, name, directory, template, base_settings,
+                        post, workers, writes,
+                    )
+        finally:
+            connections['default'].close()
+            connections['default'] = original
+
+    def bench(self, context, name, directory, template, base_settings,
+              post, workers, writes):
+        pragmas, transaction_mode, use_lock = MODES[name]
+        path = os.path.join(directory, f'{name}.sqlite3')
+        shutil.copy(template, path)
+        options = {}
+        if transaction_mode:
+            options['transaction_mode'] = transaction_mode
+        lock_path = path + '.write-lock' if use_lock else None
+        with override_settings(
+            BLOG_SQLITE_PRAGMAS=pragmas,
+            BLOG_SQLITE_WRITE_LOCK=lock_path,
+        ):
+            # journal_mode переключается один раз, до запуска писателей.
+            use_database({**base_settings, 'NAME': path, 'OPTIONS': options})
+            connections['default'].ensure_connection()
+            connections['default'].close()
+            results = context.Queue()
+            start = context.Barrier(workers)
+            processes = [
+                context.Process(
+                    target=run_writer,
+                    args=(
+                        WRITERS[number % len(WRITERS)],
+                        post, writes, start, results,
+                    ),
+                )
+                for number in range(workers)
+            ]
+            started = time.perf_counter()
+            for process in processes:
+                process.start()
+            collected = [results.get() for _ in processes]
+            for process in processes:
+                process.join()
+            elapsed = time.perf_counter() - started
+        latencies = sorted(
+            latency for _, worker in collected for latency in worker
+        )
+        errors = Counter()
+        for kind, worker in collected:
+            errors[kind] += sum(map(math.isinf, worker))
+        self.stdout.write(
+            f'{name:>17}: ошибок {sum(errors.values())} из '
+            f'{len(latencies)} ('
+            + ', '.join(f'{kind} {errors[kind]}' for kind in WRITERS)
+            + '), задержка записи с учётом ошибок '
+            f'p50 {percentile(latencies, 0.5)}, '
+            f'p99 {percentile(latencies, 0.99)}, '
+            f'{(len(latencies) - sum(errors.values())) / elapsed:.0f} '
+            'записей/с.'
+        )
@@ -0,0 +1,263 @@
+import contextlib
+import time
+from collections import Counter, defaultdict
+
+from django.contrib.auth import get_user_model
+from django.core import serializers
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from blog.cache import bump_versions
+from blog.cards import CARDS_VERSION_KEY
+from blog.db import single_writer
+from blog.dimensions import reset_dimensions
+from blog.dumps import DumpError, iter_records, open_dump
+from blog.missing import forget_missing
+from blog.models import Category, Comment, Location, Post
+from blog.pagecache import (
+    FEED_VERSION_KEY,
+    author_posts_version_key,
+    category_posts_version_key,
+)
+from blog.paginators import bump_count_version
+from blog.rendering import RENDERER_VERSION
+
+BATCH_SIZE: int = 1000
+
+User = get_user_model()
+
+# Порядок вставки: справочники и авторы раньше постов, посты раньше
+# комментариев.
+MODELS = (Category, Location, User, Post, Comment)
+
+
+def timestamp_fields(model):
+    """Поля с auto_now или auto_now_add."""
+    return [
+        field
+        for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+
+
+@contextlib.contextmanager
+def preserved_timestamps(models):
+    """
+    Отключает auto_now и auto_now_add: bulk_create иначе заменит
+    даты из выгрузки текущим временем.
+    """
+    fields = [field for model in models for field in timestamp_fields(model)]
+    flags = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, flags):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    """Потоковая загрузка выгрузки блога через bulk_create."""
+    help = (
+        'Загружает категории, местоположения, пользователей, посты и '
+        'комментарии из выгрузки dumpdata или export_blog (JSON, JSON '
+        'Lines, .gz), не читая файл в память целиком. Записи других '
+        'моделей пропускаются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл выгрузки.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько записей вставлять за один запрос.',
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='БД, в которую загружаются данные.',
+        )
+        parser.add_argument(
+            '--skip-signals',
+            action='store_true',
+            help=(
+                'Не отправлять post_save для каждой записи: поисковый '
+                'индекс перестраивается один раз после загрузки. Кеши '
+                'сбрасываются после загрузки в любом случае.'
+            ),
+        )
+        parser.add_argument(
+            '--no-rebuild',
+            action='store_true',
+            help='Не пересчитывать счётчики комментариев после загрузки.',
+        )
+
+    def handle(self, *args, path, batch_size, database, skip_signals,
+               no_rebuild, **options):
+        self.verbosity = options['verbosity']
+        self.batch_size = batch_size
+        self.database = database
+        self.send_signals = not skip_signals
+        self.models = {model._meta.label_lower: model for model in MODELS}
+        self.timestamps = {model: timestamp_fields(model) for model in MODELS}
+        self.pending = defaultdict(list)
+        self.pending_m2m = defaultdict(list)
+        self.through_models = set()
+        self.loaded = Counter()
+        self.skipped = Counter()
+        self.dependencies = set()
+        started = time.monotonic()
+        try:
+            with open_dump(path) as stream, single_writer():
+                self.load(stream)
+        except (DumpError, EOFError, IntegrityError, OSError) as error:
+            raise CommandError(f'Выгрузка не загружена: {error}')
+        self.report(time.monotonic() - started)
+        # Загрузка уже зафиксирована: всё, что читатели успели
+        # закешировать за время загрузки, сбрасываем при любом режиме.
+        self.reset_caches()
+        if not no_rebuild:
+            call_command(
+                'recount_comments', database=self.database, stdout=self.stdout
+            )
+        if not self.send_signals:
+            call_command(
+                'reindex_search', database=self.database, stdout=self.stdout
+            )
+
+    def load(self, stream):
+        """Одна транзакция, ключи проверяются в конце, как у loaddata."""
+        connection = connections[self.database]
+        with preserved_timestamps(MODELS), \
+                transaction.atomic(using=self.database):
+            with connection.constraint_checks_disabled():
+                for record in iter_records(stream):
+                    self.add(record)
+                for model in MODELS:
+                    self.flush(model)
+                for through in list(self.pending_m2m):
+                    self.flush_m2m(through)
+            connection.check_constraints(table_names=[
+                model._meta.db_table
+                for model in [*self.loaded, *self.through_models]
+            ])
+            self.reset_sequences(connection)
+
+    def report(self, elapsed):
+        for model in MODELS:
+            if self.loaded[model]:
+                self.stdout.write(
+                    f'{model._meta.verbose_name_plural}: '
+                    f'{self.loaded[model]}.'
+                )
+        for label, count in sorted(self.skipped.items()):
+            self.stdout.write(f'Пропущено {label}: {count}.')
+        total = sum(self.loaded.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено записей: {total} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-6):.0f} записей/с).'
+        ))
+
+    def add(self, record):
+        model = self.models.get(record.get('model', '').lower())
+        if model is None:
+            self.skipped[record.get('model')] += 1
+            return
+        try:
+            deserialized, = serializers.deserialize(
+                'python', [record], using=self.database,
+                ignorenonexistent=True,
+            )
+        except serializers.base.DeserializationError as error:
+            raise DumpError(error) from None
+        obj = deserialized.object
+        self.prepare(obj)
+        self.pending[model].append(obj)
+        for name, values in (deserialized.m2m_data or {}).items():
+            field = model._meta.get_field(name)
+            through = field.remote_field.through
+            source = field.m2m_field_name() + '_id'
+            target = field.m2m_reverse_field_name() + '_id'
+            self.pending_m2m[through].extend(
+                through(**{source: obj.pk, target: value})
+                for value in values
+            )
+        if len(self.pending[model]) >= self.batch_size:
+            self.flush(model)
+
+    def prepare(self, obj):
+        """То, что save() модели посчитал бы перед записью."""
+        now = timezone.now()
+        for field in self.timestamps[type(obj)]:
+            if getattr(obj, field.attname) is None:
+                # Как в миграции 0012: изменён тогда же, когда создан.
+                setattr(
+                    obj, field.attname, getattr(obj, 'created_at', None) or now
+                )
+        if isinstance(obj, Post):
+            obj.update_excerpt()
+        if (
+            isinstance(obj, (Post, Comment))
+            and obj.text_html_version != RENDERER_VERSION
+        ):
+            obj.update_text_html()
+        if isinstance(obj, Post):
+            self.dependencies.update([
+                category_posts_version_key(obj.category_id),
+                author_posts_version_key(obj.author_id),
+            ])
+
+    def flush(self, model):
+        batch = self.pending.pop(model, [])
+        if not batch:
+            return
+        model.objects.using(self.database).bulk_create(
+            batch, batch_size=self.batch_size
+        )
+        self.loaded[model] += len(batch)
+        if self.send_signals:
+            for obj in batch:
+                post_save.send(
+                    sender=model, instance=obj, created=True,
+                    update_fields=None, raw=True, using=self.database,
+                )
+        if self.verbosity >= 2:
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: {self.loaded[model]}…'
+            )
+
+    def flush_m2m(self, through):
+        self.through_models.add(through)
+        through.objects.using(self.database).bulk_create(
+            self.pending_m2m.pop(through), batch_size=self.batch_size
+        )
+
+    def reset_sequences(self, connection):
+        """Счётчики первичных ключей продолжаются за загруженными."""
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), list(self.loaded)
+        )
+        if statements:
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+
+    def reset_caches(self):
+        """Сбрасывает затронутые кеши разом после фиксации загрузки."""
+        # Карточки и страницы постов сбрасываются общей версией, а не
+        # ключом каждого поста: их в выгрузке могут быть миллионы.
+        bump_versions([
+            FEED_VERSION_KEY, CARDS_VERSION_KEY, *self.dependencies
+        ])
+        bump_count_version()
+        reset_dimensions()
+        forget_missing('post')
+        forget_missing('profile')
@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, Post
+
+BATCH_SIZE: int = 1000
+
+
+class Command(BaseCommand):
+    """Пересчёт счётчиков комментариев у публикаций."""
+    help = 'Исправляет расхождения Post.comment_count с числом комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько публикаций проверять за один запрос.',
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='БД, в которой пересчитываются счётчики.',
+        )
+
+    def handle(self, *args, batch_size, database, **options):
+        posts = Post.objects.using(database)
+        comments = Comment.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().values('post').annotate(
+            total=Count('pk')
+        ).values('total')
+        last_id = 0
+        checked = fixed = 0
+        while True:
+            batch = list(
+                posts.filter(pk__gt=last_id).order_by('pk').values_list(
+                    'pk', flat=True
+                )[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1]
+            checked += len(batch)
+            drifted = list(
+                posts.filter(pk__in=batch).annotate(
+                    actual=Count('comment')
+                ).exclude(
+                    comment_count=F('actual')
+                ).values_list('pk', flat=True)
+            )
+            if drifted:
+                fixed += posts.filter(pk__in=drifted).update(
+                    comment_count=Coalesce(Subquery(comments), 0)
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено публикаций: {checked}, исправлено: {fixed}.'
+        ))
@@ -0,0 +1,53 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from blog.cache import bump_versions
+from blog.cards import CARDS_VERSION_KEY
+from blog.dimensions import reset_dimensions
+from blog.missing import forget_missing
+from blog.pagecache import FEED_VERSION_KEY
+from blog.paginators import bump_count_version
+from blog.routers import PRIMARY
+
+
+class Command(BaseCommand):
+    """Обновляет копии SQLite, заменяющие реплики."""
+    help = (
+        'Копирует основную БД SQLite в файлы реплик из '
+        'BLOG_REPLICA_DATABASES через backup API.'
+    )
+
+    def handle(self, *args, **options):
+        primary = connections[PRIMARY]
+        if primary.vendor != 'sqlite':
+            raise CommandError(
+                'Команда работает только с SQLite: реплики других СУБД '
+                'обновляет сама СУБД.'
+            )
+        primary.ensure_connection()
+        for alias in settings.BLOG_REPLICA_DATABASES:
+            replica = connections[alias]
+            replica.close()
+            target = sqlite3.connect(replica.settings_dict['NAME'])
+            try:
+                primary.connection.backup(target)
+            finally:
+                target.close()
+            self.stdout.write(
+                f'{alias}: {replica.settings_dict["NAME"]} обновлена.'
+            )
+        self.reset_caches()
+
+    def reset_caches(self):
+        """
+        Кеши заполняются из основной БД, но прочитанное с реплик до
+        обновления (ETag, промахи в других процессах) сбрасываем.
+        """
+        bump_versions([FEED_VERSION_KEY, CARDS_VERSION_KEY])
+        bump_count_version()
+        reset_dimensions()
+        forget_missing('post')
+        forget_missing('profile')
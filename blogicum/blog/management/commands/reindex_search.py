@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from blog.models import Post
+from blog.search import get_search_backend
+
+BATCH_SIZE: int = 500
+
+
+class Command(BaseCommand):
+    """Перестройка полнотекстового индекса постов."""
+    help = (
+        'Заново индексирует все посты пачками, не опустошая индекс: '
+        'поиск работает и во время перестройки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько постов индексировать за одну транзакцию.',
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='БД, индекс которой перестраивается.',
+        )
+
+    def handle(self, *args, batch_size, database, **options):
+        backend = get_search_backend()
+        posts = Post.objects.using(database)
+        last_id = 0
+        indexed = 0
+        while True:
+            batch = list(
+                posts.filter(pk__gt=last_id).order_by('pk').only(
+                    'pk', 'title', 'text'
+                )[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].pk
+            with transaction.atomic(using=database):
+                backend.index(batch, database)
+            indexed += len(batch)
+        backend.prune(database)
+        backend.optimize(database)
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано постов: {indexed}.'
+        ))
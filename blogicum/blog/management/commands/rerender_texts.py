@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import bump_versions
+from blog.cards import CARDS_VERSION_KEY
+from blog.models import Comment, Post
+from blog.pagecache import FEED_VERSION_KEY
+from blog.rendering import RENDERER_VERSION
+
+BATCH_SIZE: int = 500
+
+
+class Command(BaseCommand):
+    """Перерисовка HTML текстов после смены версии рендерера."""
+    help = 'Пересчитывает text_html у публикаций и комментариев пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько записей обновлять за один запрос.',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Перерисовать все записи, а не только устаревшие.',
+        )
+
+    def handle(self, *args, batch_size, all, **options):
+        total = 0
+        for model in (Post, Comment):
+            queryset = model.objects.all()
+            if not all:
+                queryset = queryset.exclude(
+                    text_html_version=RENDERER_VERSION
+                )
+            last_id = 0
+            updated = 0
+            while True:
+                batch = list(
+                    queryset.filter(pk__gt=last_id).order_by('pk').only(
+                        'pk', 'text', 'text_html', 'text_html_version'
+                    )[:batch_size]
+                )
+                if not batch:
+                    break
+                last_id = batch[-1].pk
+                for item in batch:
+                    item.update_text_html()
+                model.objects.bulk_update(
+                    batch, ['text_html', 'text_html_version']
+                )
+                updated += len(batch)
+            total += updated
+            self.stdout.write(self.style.SUCCESS(
+                f'{model._meta.verbose_name_plural}: перерисовано {updated}.'
+            ))
+        # bulk_update не отправляет сигналов и не трогает updated_at:
+        # закешированные страницы, карточки и их ETag сбрасываем разом.
+        if total:
+            bump_versions([FEED_VERSION_KEY, CARDS_VERSION_KEY])
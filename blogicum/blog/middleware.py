@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+from .cache import get_versions
+from .cards import user_version_key
+from .routers import begin_request, end_request
+
+
+def get_cached_user(request):
+    """
+    Пользователь сессии из кеша.
+    Ключ собран из версии пользователя, которую сигналы увеличивают
+    при каждом сохранении User, поэтому правка профиля, смена пароля
+    или блокировка сразу дают промах. Сессия без пользователя
+    (анонимный читатель) не приводит ни к одному запросу к БД.
+    """
+    try:
+        user_id = auth._get_user_session_key(request)
+        backend_path = request.session[auth.BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return auth.get_user(request)
+    version_key = user_version_key(user_id)
+    key = 'blog:auth-user:{}:{}'.format(
+        user_id, get_versions([version_key])[version_key]
+    )
+    user = cache.get(key)
+    if user is None:
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            cache.set(
+                key,
+                user,
+                getattr(settings, 'BLOG_AUTH_USER_CACHE_TIMEOUT', 60 * 60),
+            )
+        return user
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    if not session_hash or not constant_time_compare(
+        session_hash, user.get_session_auth_hash()
+    ):
+        # Проверку и сброс устаревшей сессии оставляем Django.
+        return auth.get_user(request)
+    user.backend = backend_path
+    return user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware, берущий пользователя сессии из кеша."""
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_cached_user(request))
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Закрепляет запросы посетителя за основной БД (см. blog.routers):
+    изменяющие данные — всегда, остальные — на время после записи,
+    пока жива cookie BLOG_PRIMARY_COOKIE.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        cookie = getattr(settings, 'BLOG_PRIMARY_COOKIE', 'use_primary')
+        state, token = begin_request(
+            pinned=cookie in request.COOKIES
+            or request.method not in ('GET', 'HEAD', 'OPTIONS')
+        )
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        if state['wrote']:
+            response.set_cookie(
+                cookie,
+                '1',
+                max_age=getattr(settings, 'BLOG_REPLICA_STICKY_SECONDS', 10),
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
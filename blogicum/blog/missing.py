@@ -0,0 +1,81 @@
+"""
+Кеш промахов: адреса профилей и постов, которых точно нет в БД.
+
+Боты перебирают несуществующие адреса, и каждый такой запрос шёл в БД.
+Промахи хранятся в памяти процесса в ограниченном LRU вместе с
+поколением своего вида объектов; создание объекта увеличивает
+поколение в общем кеше, и запомненные промахи этого вида забываются.
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+
+from .cache import bump_versions, get_versions
+from .routers import primary_reads, replica_reads_possible
+
+_lock = threading.Lock()
+_missing = OrderedDict()
+
+
+def _generation_key(kind):
+    return f'blog:version:missing:{kind}'
+
+
+def _generation(kind):
+    key = _generation_key(kind)
+    return get_versions([key])[key]
+
+
+def is_known_missing(kind, key) -> bool:
+    """Объект уже искали и не нашли, и с тех пор таких не создавали."""
+    generation = _missing.get((kind, key))
+    if generation is None:
+        return False
+    if generation != _generation(kind):
+        _missing.pop((kind, key), None)
+        return False
+    with _lock:
+        try:
+            _missing.move_to_end((kind, key))
+        except KeyError:
+            # Запись вытеснили из другого потока.
+            pass
+    return True
+
+
+def remember_missing(kind, key):
+    size = getattr(settings, 'BLOG_MISSING_CACHE_SIZE', 10000)
+    with _lock:
+        _missing[(kind, key)] = _generation(kind)
+        _missing.move_to_end((kind, key))
+        while len(_missing) > size:
+            _missing.popitem(last=False)
+
+
+def forget_missing(kind):
+    """Появился новый объект: промахи этого вида больше не верны."""
+    bump_versions([_generation_key(kind)])
+
+
+def get_object_or_404_remembered(kind, key, klass, **lookup):
+    """get_object_or_404, который не ходит в БД за известными промахами."""
+    if is_known_missing(kind, key):
+        raise Http404(f'{kind} {key} не найден.')
+    replica = replica_reads_possible()
+    try:
+        return get_object_or_404(klass, **lookup)
+    except Http404:
+        if not replica:
+            remember_missing(kind, key)
+            raise
+    # Реплика могла ещё не получить новый объект: промах запоминаем,
+    # только если его подтвердила основная БД.
+    with primary_reads():
+        try:
+            return get_object_or_404(klass, **lookup)
+        except Http404:
+            remember_missing(kind, key)
+            raise
@@ -1,7 +1,300 @@
+import hashlib
+
+from django.conf import settings
+from django.db import connection
+from django.http import Http404, HttpResponse
+from django.http.response import HttpResponseBase
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_vary_headers
 from django.shortcuts import get_object_or_404, redirect
 
+from .cache import get_versions
+from .cards import render_post_cards, user_version_key
+from .db import single_writer
+from .dimensions import get_dimensions
+from .holes import fill_holes
 from .models import Post, Comment
+from .pagecache import (
+    cache_page,
+    get_cached_page,
+    page_cache_enabled,
+    page_cache_key,
+)
+from .paginators import CachedCountPaginator, CursorPaginator, InvalidCursor
+from .rendering import RENDERER_VERSION
+from .routers import primary_reads
+
+
+class QueryBudgetExceeded(Exception):
+    """Представление выполнило больше запросов к БД, чем разрешено."""
+
+
+class QueryCounter:
+    """Обёртка для connection.execute_wrapper, считающая запросы."""
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+
+class QueryBudgetMixin:
+    """
+    Вспомогательный класс.
+    Ограничивает число запросов к БД на обработку и рендеринг страницы.
+    Проверка включается настройкой QUERY_BUDGET_ENFORCED.
+    """
+    query_budget = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if (
+            self.query_budget is None
+            or not getattr(settings, 'QUERY_BUDGET_ENFORCED', False)
+        ):
+            return super().dispatch(request, *args, **kwargs)
+        # Сессию, пользователя и справочники в памяти процесса
+        # загружаем заранее: в бюджет страницы они не входят.
+        request.user.is_authenticated
+        get_dimensions()
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        if len(counter.queries) > self.query_budget:
+            raise QueryBudgetExceeded(
+                f'{type(self).__name__}: {len(counter.queries)} '
+                f'запросов при бюджете {self.query_budget}:\n'
+                + '\n'.join(counter.queries)
+            )
+        return response
+
+
+class FeedPaginationMixin:
+    """
+    Вспомогательный класс.
+    Постраничная пагинация ленты с кешированным числом постов, либо
+    курсорная, если настройка BLOG_PAGINATION_MODE равна 'cursor'.
+    """
+    paginator_class = CachedCountPaginator
+    cursor_ordering = ('-pub_date', '-id')
+    cursor_kwarg = 'cursor'
+
+    def get_pagination_mode(self):
+        return getattr(settings, 'BLOG_PAGINATION_MODE', 'offset')
+
+    def get_count_cache_key(self):
+        """Ключ кеша для размера ленты; None — считать каждый раз."""
+        return None
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset,
+            per_page,
+            count_key=self.get_count_cache_key(),
+            **kwargs,
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.get_pagination_mode() != 'cursor':
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size, self.cursor_ordering)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404('Неверный курсор страницы.')
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+
+class PostCardsMixin:
+    """
+    Вспомогательный класс.
+    Добавляет в контекст HTML карточек постов страницы из кеша фрагментов.
+    Представление задаёт get_base_queryset() — выборку постов ленты:
+    для карточек к ней добавляются связанные объекты, для ETag — только
+    поля-валидаторы.
+    """
+    def get_queryset(self):
+        return self.get_base_queryset().with_card_data()
+
+    def get_validator_rows(self):
+        return self.paginate_queryset(
+            self.get_base_queryset().validators(),
+            self.get_paginate_by(None),
+        )[2]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['post_cards'] = render_post_cards(context['object_list'])
+        return context
+
+
+class SharedPageCacheMixin:
+    """
+    Вспомогательный класс.
+    Кеширует страницу целиком, одну на всех посетителей.
+    Страница рендерится с метками вместо персональных участков
+    (см. blog.holes) и хранится вместе с версиями объектов, из которых
+    собрана; после чтения из кеша метки заполняются под пользователя.
+    """
+    def get_page_cache_keys(self):
+        """
+        Ключи версий, известные до чтения страницы из БД: из аргументов
+        адреса. Их версии снимаются до запроса и сохраняются вместе
+        со страницей, поэтому запись, зафиксированная во время
+        рендеринга, делает сохранённую страницу устаревшей.
+        """
+        return []
+
+    def get_page_cache_dependencies(self, context):
+        """Ключи версий, от которых зависит страница."""
+        return []
+
+    def get_page_cache_timeout(self):
+        """Сколько секунд страница может жить без изменений в БД."""
+        return None
+
+    def dispatch(self, request, *args, **kwargs):
+        if not page_cache_enabled() or request.method not in (
+            'GET', 'HEAD'
+        ):
+            return super().dispatch(request, *args, **kwargs)
+        content = self.get_shared_page(request, *args, **kwargs)
+        if isinstance(content, HttpResponseBase):
+            return content
+        return self.fill_shared_page(content, request)
+
+    def get_shared_page(self, request, *args, **kwargs):
+        """
+        Общее тело страницы с метками, из кеша или только что собранное.
+        Если страницу кешировать нельзя (ошибка, переадресация), — ответ
+        представления.
+        """
+        request.punch_holes = True
+        key = page_cache_key(request)
+        content = get_cached_page(key)
+        if content is None:
+            # Страница попадёт в общий кеш: собираем её из основной БД.
+            with primary_reads():
+                versions = get_versions(self.get_page_cache_keys())
+                response = super().dispatch(request, *args, **kwargs)
+                if response.status_code != 200 or not hasattr(
+                    response, 'render'
+                ):
+                    return response
+                response.render()
+            content = response.content.decode(response.charset)
+            cache_page(
+                key,
+                content,
+                self.get_page_cache_dependencies(response.context_data),
+                self.get_page_cache_timeout(),
+                versions,
+            )
+        return content
+
+    def fill_shared_page(self, content, request):
+        """Ответ с телом, заполненным под пользователя запроса."""
+        response = HttpResponse(fill_holes(content, request))
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Вспомогательный класс.
+    Отвечает 304 Not Modified, не рендеря страницу, если она не менялась.
+    ETag собирается из лёгкой выборки строк страницы (id, updated_at,
+    comment_count), версий объектов, от которых страница зависит, и
+    версии пользователя: в шапке его имя. Last-Modified не отдаётся:
+    счётчики комментариев и правки справочников не меняют updated_at.
+    Когда страницы кешируются целиком (с SharedPageCacheMixin), ETag —
+    хеш общего тела страницы и версии пользователя (см. dispatch_cached).
+    Представление задаёт get_validator_rows() — строки страницы с полями
+    из PublishedPostQuerySet.validators — и get_validator_dependencies(rows)
+    — ключи версий, от которых зависит страница.
+    """
+    def get_user_versions(self, dependencies=()):
+        """Версии зависимостей вместе с версией пользователя запроса."""
+        dependencies = list(dependencies)
+        user_id = self.request.user.pk
+        if user_id is not None:
+            dependencies.append(user_version_key(user_id))
+        return get_versions(dependencies)
+
+    def get_etag(self, rows):
+        versions = self.get_user_versions(
+            self.get_validator_dependencies(rows)
+        )
+        state = (
+            self.request.user.pk,
+            RENDERER_VERSION,
+            [
+                (
+                    row._meta.model_name,
+                    row.pk,
+                    row.updated_at,
+                    getattr(row, 'comment_count', None),
+                )
+                for row in rows
+            ],
+            sorted(versions.items()),
+        )
+        return '"{}"'.format(hashlib.md5(repr(state).encode()).hexdigest())
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        if page_cache_enabled():
+            return self.dispatch_cached(request, *args, **kwargs)
+        try:
+            rows = list(self.get_validator_rows())
+        except Http404:
+            return super().dispatch(request, *args, **kwargs)
+        etag = self.get_etag(rows)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+    def dispatch_cached(self, request, *args, **kwargs):
+        """
+        Страница из общего кеша уже дешевле запроса валидаторов к БД:
+        ETag — хеш её общего тела, пользователя и его версии. Тело,
+        заполненное под пользователя, не годится: в форме комментария
+        csrf_token, который меняется на каждом запросе.
+        """
+        content = self.get_shared_page(request, *args, **kwargs)
+        if isinstance(content, HttpResponseBase):
+            return content
+        digest = hashlib.md5(content.encode())
+        digest.update(repr((
+            request.user.pk, sorted(self.get_user_versions().items())
+        )).encode())
+        etag = '"{}"'.format(digest.hexdigest())
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = self.fill_shared_page(content, request)
+        response['ETag'] = etag
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+
+class SingleWriterMixin:
+    """
+    Вспомогательный класс.
+    Выполняет запросы на запись по одному на все процессы (см. blog.db).
+    """
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD', 'OPTIONS'):
+            return super().dispatch(request, *args, **kwargs)
+        with single_writer():
+            return super().dispatch(request, *args, **kwargs)
 
 
 class URLProfileMixin:
@@ -20,10 +313,21 @@ class PostDispatchMixin:
     """
     Вспомогательный класс.
     Переопределяет dispatch, для получения и проверки автора публикации.
+    Публикация загружается один раз и переиспользуется в get_object.
     """
+    _object = None
+
+    def get_object(self, queryset=None):
+        if self._object is None:
+            self._object = get_object_or_404(
+                Post.objects.select_related('location'),
+                id=self.kwargs['post_id'],
+            )
+        return self._object
+
     def dispatch(self, request, *args, **kwargs):
-        posts = get_object_or_404(Post, id=self.kwargs['post_id'])
-        if request.user != posts.author:
+        posts = self.get_object()
+        if posts.author_id != request.user.id:
             return redirect('blog:post_detail', post_id=posts.pk)
         return super().dispatch(request, *args, **kwargs)
 
@@ -44,9 +348,21 @@ class CommentDispacthMixin:
     """
     Вспомогательный класс.
     Переопределяет dispatch, для получения и проверки автора комментария.
+    Комментарий загружается один раз и переиспользуется в get_object.
     """
+    _object = None
+
+    def get_object(self, queryset=None):
+        if self._object is None:
+            self._object = get_object_or_404(
+                Comment,
+                id=self.kwargs['comment_id'],
+                post_id=self.kwargs['post_id'],
+            )
+        return self._object
+
     def dispatch(self, request, *args, **kwargs):
-        posts = get_object_or_404(Comment, id=self.kwargs['comment_id'])
-        if request.user != posts.author:
-            return redirect('blog:post_detail', post_id=posts.pk)
+        comment = self.get_object()
+        if comment.author_id != request.user.id:
+            return redirect('blog:post_detail', post_id=comment.post_id)
         return super().dispatch(request, *args, **kwargs)
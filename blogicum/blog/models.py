@@ -1,5 +1,14 @@
 from django.db import models
+from django.db.models import Lookup, Q
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
+
+from .dimensions import DimensionsIterable, get_dimensions
+from .rendering import RENDERER_VERSION, render_text
+
+EXCERPT_WORDS: int = 10
 
 User = get_user_model()
 
@@ -18,6 +27,32 @@ class BaseModel(models.Model):
         abstract = True
 
 
+class ModifiedDateTimeField(models.DateTimeField):
+    """
+    Дата и время последнего изменения записи.
+    Отдельный класс отличает её от даты создания, когда поля модели
+    разбираются по типам; в миграциях это обычный DateTimeField.
+    """
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        return name, 'django.db.models.DateTimeField', args, kwargs
+
+
+class BaseModifiedModel(models.Model):
+    """
+    Абстрактная модель.
+    Добавляет к модели дату изменения.
+    """
+    updated_at = ModifiedDateTimeField(
+        auto_now=True,
+        verbose_name='Изменено',
+    )
+
+    class Meta:
+        abstract = True
+
+
 class BasePublishedModel(models.Model):
     """
     Абстрактная модель.
@@ -62,6 +97,60 @@ class BaseTitleModel(models.Model):
         abstract = True
 
 
+class RenderedHTMLField(models.TextField):
+    """
+    Текстовое поле с HTML, собранным из другого поля модели.
+    Отдельный класс отличает его от исходного текста, когда поля модели
+    разбираются по типам; в миграциях это обычный TextField.
+    """
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        return name, 'django.db.models.TextField', args, kwargs
+
+
+class BaseRenderedTextModel(models.Model):
+    """
+    Абстрактная модель.
+    Добавляет к модели с полем text готовый HTML этого текста.
+    """
+    text_html = RenderedHTMLField(
+        blank=True,
+        editable=False,
+        verbose_name='Текст в HTML',
+    )
+    text_html_version = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия HTML',
+    )
+
+    class Meta:
+        abstract = True
+
+    @property
+    def rendered_text(self):
+        """HTML текста: сохранённый, если он актуален."""
+        if self.text_html_version == RENDERER_VERSION:
+            return mark_safe(self.text_html)
+        return render_text(self.text)
+
+    def update_text_html(self):
+        """Перерисовывает HTML текста."""
+        self.text_html = render_text(self.text)
+        self.text_html_version = RENDERER_VERSION
+
+    def save(self, *args, **kwargs):
+        if 'text' not in self.get_deferred_fields():
+            self.update_text_html()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {
+                *update_fields, 'text_html', 'text_html_version'
+            }
+        super().save(*args, **kwargs)
+
+
 class Location(BaseModel, BasePublishedModel):
     """Географическая метка"""
     name = models.CharField(
@@ -100,11 +189,62 @@ class Category(BaseModel, BasePublishedModel, BaseTitleModel):
         return self.title
 
 
-class Post(BaseModel, BaseAuthorModel, BasePublishedModel, BaseTitleModel):
+class PublishedPostQuerySet(models.QuerySet):
+    """
+    Набор запросов к публикациям.
+    Собирает выборки для лент из цепочки вызовов.
+    """
+
+    def visible(self, now=None):
+        """Опубликованные посты с наступившей датой публикации."""
+        if now is None:
+            now = timezone.now()
+        return self.filter(
+            pub_date__lte=now,
+            is_published=True,
+            category__in=get_dimensions().published_category_ids,
+        )
+
+    def with_dimensions(self):
+        """Категория и местоположение из памяти процесса, без JOIN."""
+        clone = self._chain()
+        clone._iterable_class = DimensionsIterable
+        return clone
+
+    def with_card_data(self):
+        """Связанные объекты для карточки поста, без полного текста."""
+        return self.select_related(
+            'author',
+        ).with_dimensions().defer('text', 'text_html')
+
+    def for_author(self, user):
+        """Посты автора."""
+        return self.filter(author=user)
+
+    def validators(self):
+        """Только поля, из которых собирается ETag страницы."""
+        return self.only(
+            'updated_at', 'comment_count', 'author', 'category', 'location'
+        )
+
+
+class Post(
+    BaseModel,
+    BaseModifiedModel,
+    BaseAuthorModel,
+    BasePublishedModel,
+    BaseTitleModel,
+    BaseRenderedTextModel,
+):
     """Публикация"""
     text = models.TextField(
         verbose_name='Текст',
     )
+    excerpt = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name='Отрывок текста',
+    )
     pub_date = models.DateTimeField(
         verbose_name='Дата и время публикации',
         help_text=(
@@ -130,23 +270,64 @@ class Post(BaseModel, BaseAuthorModel, BasePublishedModel, BaseTitleModel):
         upload_to='post_images',
         blank=True,
     )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+    )
 
     objects = models.Manager()
-    published = models.Manager()
+    published = PublishedPostQuerySet.as_manager()
 
     class Meta:
         ordering = [
             '-pub_date',
             'title',
         ]
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                condition=Q(is_published=True),
+                name='post_published_feed_idx',
+            ),
+            models.Index(
+                fields=['category', '-pub_date', '-id'],
+                condition=Q(is_published=True),
+                name='post_published_category_idx',
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_feed_idx',
+            ),
+        ]
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
 
     def __str__(self):
         return self.title
 
+    def update_excerpt(self):
+        """Пересчитывает отрывок текста для карточки поста."""
+        self.excerpt = Truncator(self.text).words(
+            EXCERPT_WORDS,
+            truncate=' …',
+        )
+
+    def save(self, *args, **kwargs):
+        if 'text' not in self.get_deferred_fields():
+            self.update_excerpt()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        super().save(*args, **kwargs)
+
 
-class Comment(BaseModel, BaseAuthorModel):
+class Comment(
+    BaseModel,
+    BaseModifiedModel,
+    BaseAuthorModel,
+    BaseRenderedTextModel,
+):
     """Комментарий к публикации."""
     text = models.TextField(
         verbose_name='Текст комментария',
@@ -158,9 +339,54 @@ class Comment(BaseModel, BaseAuthorModel):
     )
 
     class Meta:
-        ordering = ['created_at', 'author']
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(
+                fields=['post', 'created_at', 'id'],
+                name='comment_post_created_id_idx',
+            ),
+        ]
         verbose_name = 'коментарий'
         verbose_name_plural = 'Комментарии'
 
     def __str__(self):
         return self.author
+
+
+class SearchDocumentField(models.TextField):
+    """
+    Скрытый столбец таблицы FTS5 с её именем: по нему ищут MATCH.
+    """
+
+
+@SearchDocumentField.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+class PostSearchIndex(models.Model):
+    """
+    Полнотекстовый индекс постов: виртуальная таблица SQLite FTS5.
+    Таблицу создаёт миграция, а не Django; строки поддерживают сигналы
+    и команда reindex_search.
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search_index',
+    )
+    title = models.TextField()
+    text = models.TextField()
+    document = SearchDocumentField(db_column='blog_post_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'blog_post_fts'
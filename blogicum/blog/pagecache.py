@@ -0,0 +1,87 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Min
+from django.utils import timezone
+
+from .cache import get_versions
+from .cards import post_card_version_keys
+from .routers import read_from_replica
+
+FEED_VERSION_KEY = 'blog:version:feed'
+
+
+def category_posts_version_key(category_id):
+    return f'blog:version:category-posts:{category_id}'
+
+
+def author_posts_version_key(user_id):
+    return f'blog:version:author-posts:{user_id}'
+
+
+def posts_dependencies(posts):
+    """Ключи версий, от которых зависят карточки постов страницы."""
+    return [key for post in posts for key in post_card_version_keys(post)]
+
+
+def page_cache_enabled() -> bool:
+    return getattr(settings, 'BLOG_PAGE_CACHE_ENABLED', False)
+
+
+def page_cache_key(request) -> str:
+    """Ключ страницы: адрес и номер страницы ленты или курсор."""
+    url = '{}?page={}&cursor={}'.format(
+        request.path,
+        request.GET.get('page', ''),
+        request.GET.get('cursor', ''),
+    )
+    return 'blog:page:' + hashlib.md5(url.encode()).hexdigest()
+
+
+def get_cached_page(key):
+    """
+    Сохранённое тело страницы, если ни одна её зависимость не изменилась.
+    Вместе со страницей хранятся версии ключей, от которых она зависит.
+    """
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    versions, content = entry
+    if cache.get_many(list(versions)) != versions:
+        return None
+    return content
+
+
+def cache_page(key, content, dependencies, timeout=None, versions=None):
+    """
+    Сохраняет тело страницы вместе с версиями зависимостей.
+    `versions` — версии, снятые до чтения страницы из БД: они важнее
+    текущих, которые могли увеличиться уже после чтения.
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'BLOG_PAGE_CACHE_TIMEOUT', 60 * 60 * 24)
+    if timeout <= 0 or read_from_replica():
+        return
+    versions = versions or {}
+    versions = {
+        **get_versions(list(set(dependencies) - set(versions))),
+        **versions,
+    }
+    cache.set(key, (versions, content), timeout)
+
+
+def seconds_until_next_publication(queryset, default):
+    """
+    Через сколько секунд в ленте появится отложенный пост.
+    Такая публикация не вызывает сигналов, поэтому страница
+    не должна пережить её время.
+    """
+    now = timezone.now()
+    next_pub_date = queryset.filter(
+        is_published=True,
+        pub_date__gt=now,
+    ).aggregate(next_pub_date=Min('pub_date'))['next_pub_date']
+    if next_pub_date is None:
+        return default
+    return min(default, int((next_pub_date - now).total_seconds()) + 1)
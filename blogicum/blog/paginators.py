@@ -0,0 +1,228 @@
+import base64
+import binascii
+import json
+import threading
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .cache import bump_versions, get_versions
+from .routers import primary_reads
+
+COUNT_VERSION_KEY = 'blog:count-version'
+PAGE_WINDOW_ON_EACH_SIDE: int = 2
+PAGE_WINDOW_ON_ENDS: int = 1
+
+
+class InvalidCursor(Exception):
+    """Курсор страницы повреждён или подделан."""
+
+
+def encode_cursor(values, forward=True) -> str:
+    """Упаковывает значения ключа сортировки в непрозрачный токен."""
+    payload = {
+        'v': [
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in values
+        ],
+        'f': forward,
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token: str):
+    """Распаковывает токен: возвращает значения ключа и направление."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+        return list(payload['v']), bool(payload['f'])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise InvalidCursor(token)
+
+
+class CursorPage:
+    """Страница курсорной пагинации."""
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Пагинация по ключу сортировки (keyset) вместо OFFSET.
+    Стоимость страницы не зависит от её глубины, а вставка новых
+    записей не сдвигает уже выданные страницы.
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.fields = [
+            (name.lstrip('-'), name.startswith('-')) for name in ordering
+        ]
+
+    def _order_by(self, forward):
+        return [
+            f'-{name}' if descending == forward else name
+            for name, descending in self.fields
+        ]
+
+    def _after(self, values, forward):
+        condition = Q()
+        for index, (name, descending) in enumerate(self.fields):
+            lookup = 'lt' if descending == forward else 'gt'
+            step = Q(**{f'{name}__{lookup}': values[index]})
+            for prev_index, (prev_name, _) in enumerate(self.fields[:index]):
+                step &= Q(**{prev_name: values[prev_index]})
+            condition |= step
+        return condition
+
+    def _parse(self, values):
+        if len(values) != len(self.fields):
+            raise InvalidCursor(values)
+        model = self.queryset.model
+        parsed = []
+        for (name, _), value in zip(self.fields, values):
+            field = model._meta.get_field(name)
+            try:
+                if field.get_internal_type() == 'DateTimeField':
+                    value = parse_datetime(value)
+                    if value is None:
+                        raise ValueError
+                else:
+                    value = field.to_python(value)
+            except Exception:
+                raise InvalidCursor(values)
+            parsed.append(value)
+        return parsed
+
+    def _key(self, obj):
+        return [getattr(obj, name) for name, _ in self.fields]
+
+    def page(self, cursor=None):
+        """Возвращает страницу, следующую за курсором."""
+        forward = True
+        queryset = self.queryset
+        if cursor:
+            values, forward = decode_cursor(cursor)
+            queryset = queryset.filter(
+                self._after(self._parse(values), forward)
+            )
+        rows = list(
+            queryset.order_by(*self._order_by(forward))[:self.per_page + 1]
+        )
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+        if not rows:
+            return CursorPage(rows, None, None)
+        has_next = has_more if forward else True
+        has_previous = bool(cursor) if forward else has_more
+        return CursorPage(
+            rows,
+            encode_cursor(self._key(rows[-1])) if has_next else None,
+            encode_cursor(
+                self._key(rows[0]), forward=False
+            ) if has_previous else None,
+        )
+
+
+def bump_count_version():
+    """Сбрасывает закешированные размеры лент."""
+    bump_versions([COUNT_VERSION_KEY])
+
+
+def _refresh_count(key, queryset, timeout):
+    try:
+        with primary_reads():
+            count = queryset.count()
+        cache.set(key, (count, time.time() + timeout), None)
+    finally:
+        cache.delete(f'{key}:lock')
+        connection.close()
+
+
+def cached_count(key, queryset):
+    """
+    Число объектов выборки из кеша.
+    Устаревшее значение отдаётся сразу, а пересчёт идёт в фоне.
+    """
+    timeout = getattr(settings, 'BLOG_COUNT_CACHE_TIMEOUT', 60)
+    version = get_versions([COUNT_VERSION_KEY])[COUNT_VERSION_KEY]
+    key = f'blog:count:{version}:{key}'
+    cached = cache.get(key)
+    if cached is None:
+        with primary_reads():
+            count = queryset.count()
+        cache.set(key, (count, time.time() + timeout), None)
+        return count
+    count, refresh_at = cached
+    if refresh_at < time.time() and cache.add(f'{key}:lock', 1, timeout):
+        threading.Thread(
+            target=_refresh_count,
+            args=(key, queryset.all(), timeout),
+            daemon=True,
+        ).start()
+    return count
+
+
+class WindowedPage(Page):
+    """Страница, которая знает только ближайшие номера страниц."""
+
+    @property
+    def page_window(self):
+        return self.paginator.get_elided_page_range(
+            self.number,
+            on_each_side=PAGE_WINDOW_ON_EACH_SIDE,
+            on_ends=PAGE_WINDOW_ON_ENDS,
+        )
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Постраничная пагинация с окном ссылок и кешированным COUNT(*).
+    Без count_key ведёт себя как обычный Paginator.
+    """
+
+    def __init__(self, object_list, per_page, count_key=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_key = count_key
+
+    @cached_property
+    def count(self):
+        if self.count_key is None:
+            return super().count
+        return cached_count(self.count_key, self.object_list)
+
+    def _get_page(self, *args, **kwargs):
+        return WindowedPage(*args, **kwargs)
@@ -0,0 +1,10 @@
+from django.template.defaultfilters import linebreaksbr
+
+# Увеличьте при изменении render_text: старые записи перерисует
+# команда rerender_texts.
+RENDERER_VERSION: int = 1
+
+
+def render_text(text: str) -> str:
+    """Текст публикации или комментария в безопасный HTML."""
+    return linebreaksbr(text, autoescape=True)
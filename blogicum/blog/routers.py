@@ -0,0 +1,117 @@
+"""
+Маршрутизация запросов между основной БД и репликами для чтения.
+
+Чтение идёт на случайную реплику из BLOG_REPLICA_DATABASES, запись —
+в основную БД. Пользователи, сессии и служебные таблицы всегда читаются
+из основной БД. Чтобы автор сразу видел свой пост или комментарий,
+ReplicaStickinessMiddleware (см. blog.middleware) закрепляет за основной
+БД запросы, изменяющие данные, и на BLOG_REPLICA_STICKY_SECONDS после
+записи — все запросы этого посетителя.
+
+Кеши с версиями (страницы, карточки, счётчики, справочники, промахи)
+заполняются только из основной БД: версия увеличивается при записи
+в основную БД, и прочитанное с отстающей реплики легло бы в кеш
+под уже новой версией. Заполняющий кеш код читает внутри primary_reads(),
+а сохранение того, что прочитано с реплики, пропускает (read_from_replica).
+"""
+import contextlib
+import contextvars
+import random
+
+from django.conf import settings
+
+PRIMARY = 'default'
+PRIMARY_APPS = {'admin', 'auth', 'contenttypes', 'sessions'}
+
+_request_state = contextvars.ContextVar('blog_db_request_state', default=None)
+
+
+def replica_databases():
+    return getattr(settings, 'BLOG_REPLICA_DATABASES', [])
+
+
+def begin_request(pinned):
+    """
+    Начинает учёт запросов к БД для обработки одного HTTP-запроса.
+    Возвращает состояние и токен для end_request.
+    """
+    state = {'pinned': pinned, 'wrote': False, 'replica': False}
+    return state, _request_state.set(state)
+
+
+def end_request(token):
+    _request_state.reset(token)
+
+
+def pinned_to_primary() -> bool:
+    state = _request_state.get()
+    return state is not None and (state['pinned'] or state['wrote'])
+
+
+def read_from_replica() -> bool:
+    """В текущем запросе уже было чтение с реплики."""
+    state = _request_state.get()
+    if state is None:
+        return bool(replica_databases())
+    return state['replica']
+
+
+def replica_reads_possible() -> bool:
+    """Следующее чтение может уйти на реплику."""
+    return bool(replica_databases()) and not pinned_to_primary()
+
+
+@contextlib.contextmanager
+def primary_reads():
+    """
+    Чтение из основной БД внутри блока: для данных, которые попадут
+    в кеш. Вне HTTP-запроса (команды, фоновые потоки) тоже действует.
+    """
+    state = _request_state.get()
+    if state is None:
+        state, token = begin_request(pinned=True)
+        try:
+            yield
+        finally:
+            end_request(token)
+        return
+    pinned = state['pinned']
+    state['pinned'] = True
+    try:
+        yield
+    finally:
+        state['pinned'] = pinned
+
+
+class ReplicaRouter:
+    """Чтение с реплик, запись и авторизация — в основной БД."""
+
+    def db_for_read(self, model, **hints):
+        replicas = replica_databases()
+        if (
+            not replicas
+            or model._meta.app_label in PRIMARY_APPS
+            or pinned_to_primary()
+        ):
+            return PRIMARY
+        state = _request_state.get()
+        if state is not None:
+            state['replica'] = True
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state['wrote'] = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *replica_databases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replica_databases():
+            return False
+        return None
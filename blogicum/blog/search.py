@@ -0,0 +1,207 @@
+"""
+Полнотекстовый поиск по постам.
+
+Запрос посетителя разбирается в список термов: слов, фраз в кавычках
+и префиксов со звёздочкой в конце. Всё, кроме букв и цифр, отбрасывается,
+поэтому в выражение для БД не попадает синтаксис из ввода.
+
+Бэкенд задаётся настройкой BLOG_SEARCH_BACKEND:
+FTS5Backend ищет по виртуальной таблице SQLite FTS5 и ранжирует bm25,
+SimpleBackend — запасной вариант для других СУБД через icontains.
+"""
+import re
+from functools import lru_cache
+from typing import List, NamedTuple
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+
+from .models import Post, PostSearchIndex
+
+MAX_TERMS: int = 16
+SNIPPET_WORDS: int = 16
+SNIPPET_CHARS: int = 160
+
+TOKEN_RE = re.compile(r'"([^"]*)"?|(\S+)')
+WORD_RE = re.compile(r'\w+')
+
+# Границы совпадений в тексте фрагмента до экранирования HTML.
+MARK_OPEN = '\x02'
+MARK_CLOSE = '\x03'
+
+
+class SearchTerm(NamedTuple):
+    words: List[str]
+    prefix: bool
+
+
+def parse_query(query: str) -> List[SearchTerm]:
+    """
+    Термы запроса: «"точная фраза"», «слово» и «префикс*».
+    Слово с дефисом или апострофом считается фразой из его частей.
+    """
+    terms = []
+    for phrase, word in TOKEN_RE.findall(query):
+        words = WORD_RE.findall(phrase or word)
+        if words:
+            terms.append(SearchTerm(
+                words, prefix=not phrase and word.endswith('*')
+            ))
+    return terms[:MAX_TERMS]
+
+
+def highlight(text: str) -> str:
+    """Экранирует фрагмент и превращает границы совпадений в <mark>."""
+    return mark_safe(
+        escape(text)
+        .replace(MARK_OPEN, '<mark>')
+        .replace(MARK_CLOSE, '</mark>')
+    )
+
+
+class SimpleBackend:
+    """Поиск через icontains: полный просмотр таблицы, без ранжирования."""
+
+    def filter(self, queryset, terms):
+        for term in terms:
+            needle = ' '.join(term.words)
+            queryset = queryset.filter(
+                Q(title__icontains=needle) | Q(text__icontains=needle)
+            )
+        return queryset.order_by('-pub_date')
+
+    def snippets(self, posts, terms):
+        pattern = re.compile(
+            '|'.join(
+                r'\W+'.join(map(re.escape, term.words))
+                for term in terms
+            ),
+            re.IGNORECASE,
+        )
+        for post in posts:
+            match = pattern.search(post.text)
+            start = max(match.start() - SNIPPET_CHARS // 3, 0) if match else 0
+            fragment = post.text[start:start + SNIPPET_CHARS]
+            fragment = pattern.sub(
+                lambda found: MARK_OPEN + found.group(0) + MARK_CLOSE,
+                fragment,
+            )
+            post.search_snippet = highlight(
+                ('…' if start else '') + fragment
+                + ('…' if start + SNIPPET_CHARS < len(post.text) else '')
+            )
+
+    def search(self, queryset, query):
+        terms = parse_query(query)
+        if not terms:
+            return queryset.none(), terms
+        return self.filter(queryset, terms), terms
+
+    def index(self, posts, using=None):
+        pass
+
+    def remove(self, post_ids, using=None):
+        pass
+
+    def prune(self, using=None):
+        """Убирает из индекса удалённые посты."""
+
+    def optimize(self, using=None):
+        """Сжимает индекс после массового обновления."""
+
+
+class FTS5Backend(SimpleBackend):
+    """Поиск по таблице FTS5 blog_post_fts с ранжированием bm25."""
+    table = PostSearchIndex._meta.db_table
+
+    @staticmethod
+    def connection(using):
+        """Соединение для записи в индекс: БД постов, по умолчанию основная."""
+        return connections[using or router.db_for_write(Post)]
+
+    @staticmethod
+    def expression(terms):
+        return ' '.join(
+            '"{}"{}'.format(' '.join(term.words), '*' if term.prefix else '')
+            for term in terms
+        )
+
+    def filter(self, queryset, terms):
+        # Ранг только в ORDER BY: COUNT(*) пагинатора сбрасывает
+        # сортировку и не считает bm25 для каждого совпадения.
+        return queryset.filter(
+            search_index__document__match=self.expression(terms)
+        ).order_by(RawSQL(f'"{self.table}"."rank"', ()).asc(), '-pub_date')
+
+    def snippets(self, posts, terms):
+        """Фрагменты считаются одним запросом только для постов страницы."""
+        posts = list(posts)
+        if not posts:
+            return
+        with connections[posts[0]._state.db].cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, snippet("{self.table}", 1, %s, %s, %s, %s) '
+                f'FROM "{self.table}" WHERE "{self.table}" MATCH %s '
+                'AND rowid IN ({})'.format(', '.join(['%s'] * len(posts))),
+                [
+                    MARK_OPEN, MARK_CLOSE, '…', SNIPPET_WORDS,
+                    self.expression(terms),
+                    *[post.pk for post in posts],
+                ],
+            )
+            fragments = dict(cursor.fetchall())
+        for post in posts:
+            post.search_snippet = highlight(fragments.get(post.pk, ''))
+
+    def index(self, posts, using=None):
+        posts = list(posts)
+        if not posts:
+            return
+        self.remove([post.pk for post in posts], using)
+        with self.connection(using).cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, title, text) '
+                'VALUES (%s, %s, %s)',
+                [(post.pk, post.title, post.text) for post in posts],
+            )
+
+    def remove(self, post_ids, using=None):
+        post_ids = list(post_ids)
+        if not post_ids:
+            return
+        with self.connection(using).cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE rowid IN ({{}})'.format(
+                    ', '.join(['%s'] * len(post_ids))
+                ),
+                post_ids,
+            )
+
+    def prune(self, using=None):
+        with self.connection(using).cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE rowid NOT IN '
+                f'(SELECT id FROM {Post._meta.db_table})'
+            )
+
+    def optimize(self, using=None):
+        with self.connection(using).cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')"
+            )
+
+
+@lru_cache(maxsize=None)
+def _load_backend(path):
+    return import_string(path)()
+
+
+def get_search_backend():
+    return _load_backend(
+        getattr(settings, 'BLOG_SEARCH_BACKEND', 'blog.search.SimpleBackend')
+    )
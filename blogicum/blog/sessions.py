@@ -0,0 +1,31 @@
+"""
+Хранилище сессий в кеше с копией в БД.
+
+Отличается от django.contrib.sessions.backends.cached_db тем, что
+запись значения, совпадающего с загруженным, не помечает сессию
+изменённой, и SessionMiddleware не сохраняет её заново. Сравнение идёт
+с копией, снятой при загрузке: изменённый на месте список или словарь
+(cart = session['cart']; cart.append(x); session['cart'] = cart)
+по-прежнему сохраняется.
+"""
+import copy
+
+from django.contrib.sessions.backends import cached_db
+
+_MISSING = object()
+
+
+class SessionStore(cached_db.SessionStore):
+
+    def load(self):
+        data = super().load()
+        self._loaded = copy.deepcopy(data)
+        return data
+
+    def __setitem__(self, key, value):
+        modified = self.modified
+        super().__setitem__(key, value)
+        if not modified and getattr(self, '_loaded', {}).get(
+            key, _MISSING
+        ) == value:
+            self.modified = False
@@ -0,0 +1,174 @@
+import functools
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import bump_versions
+from .cards import (
+    category_version_key,
+    location_version_key,
+    post_version_key,
+    user_version_key,
+)
+from .dimensions import reset_dimensions
+from .missing import forget_missing
+from .models import Category, Comment, Location, Post
+from .pagecache import (
+    FEED_VERSION_KEY,
+    author_posts_version_key,
+    category_posts_version_key,
+)
+from .paginators import bump_count_version
+from .search import get_search_backend
+
+User = get_user_model()
+
+
+def after_commit(using, function, *args):
+    """
+    Откладывает сброс кеша до фиксации транзакции: иначе параллельный
+    запрос успеет прочитать старую строку и закешировать её под новой
+    версией.
+    """
+    transaction.on_commit(functools.partial(function, *args), using=using)
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw, **kwargs):
+    """Увеличивает счётчик комментариев поста."""
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """Уменьшает счётчик комментариев поста."""
+    Post.objects.filter(
+        pk=instance.post_id,
+        comment_count__gt=0,
+    ).update(comment_count=F('comment_count') - 1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_feed_counts(sender, using, **kwargs):
+    """Сбрасывает закешированные размеры лент."""
+    after_commit(using, bump_count_version)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def reset_post_card(sender, instance, using, **kwargs):
+    """Карточка поста устарела."""
+    after_commit(using, bump_versions, [post_version_key(instance.pk)])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_category_cards(sender, instance, using, **kwargs):
+    """Устарели карточки постов категории."""
+    after_commit(using, bump_versions, [category_version_key(instance.pk)])
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def reset_location_cards(sender, instance, using, **kwargs):
+    """Устарели карточки постов с этим местоположением."""
+    after_commit(using, bump_versions, [location_version_key(instance.pk)])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def reset_author_cards(sender, instance, using, **kwargs):
+    """Устарели карточки постов автора: могло смениться имя."""
+    after_commit(using, bump_versions, [user_version_key(instance.pk)])
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_owners(sender, instance, raw, **kwargs):
+    """Запоминает прежние категорию и автора поста."""
+    instance._previous_owners = []
+    if instance.pk and not raw:
+        instance._previous_owners = list(
+            Post.objects.filter(pk=instance.pk).values_list(
+                'category_id', 'author_id'
+            )
+        )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def reset_post_pages(sender, instance, using, **kwargs):
+    """Устарели ленты, в которые пост входил или вошёл."""
+    owners = getattr(instance, '_previous_owners', []) + [
+        (instance.category_id, instance.author_id)
+    ]
+    keys = {FEED_VERSION_KEY}
+    for category_id, author_id in owners:
+        keys.add(category_posts_version_key(category_id))
+        keys.add(author_posts_version_key(author_id))
+    after_commit(using, bump_versions, keys)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_category_pages(sender, instance, using, **kwargs):
+    """Снятие категории с публикации меняет состав лент."""
+    after_commit(using, bump_versions, [
+        FEED_VERSION_KEY,
+        category_posts_version_key(instance.pk),
+    ])
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def reset_comment_post_page(sender, instance, using, **kwargs):
+    """Устарела страница поста с комментарием."""
+    after_commit(using, bump_versions, [post_version_key(instance.post_id)])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def reset_dimensions_cache(sender, using, **kwargs):
+    """Справочники в памяти процессов устарели."""
+    after_commit(using, reset_dimensions)
+
+
+@receiver(post_save, sender=Post)
+def forget_missing_post(sender, created, using, **kwargs):
+    """Новый пост мог занять запомненный как отсутствующий адрес."""
+    if created:
+        after_commit(using, forget_missing, 'post')
+
+
+@receiver(post_save, sender=User)
+def forget_missing_profile(sender, created, update_fields, using,
+                           **kwargs):
+    """Новое или переименованное имя пользователя."""
+    if created or update_fields is None or 'username' in update_fields:
+        after_commit(using, forget_missing, 'profile')
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, update_fields, using, **kwargs):
+    """Обновляет пост в полнотекстовом индексе."""
+    if update_fields is not None and not {'title', 'text'} & set(
+        update_fields
+    ):
+        return
+    get_search_backend().index([instance], using)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, using, **kwargs):
+    """Убирает пост из полнотекстового индекса."""
+    get_search_backend().remove([instance.pk], using)
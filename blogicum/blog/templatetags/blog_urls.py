@@ -0,0 +1,17 @@
+from django import template
+
+from blog.urlbuilder import URLBuilder
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def blog_url(context, viewname, *args, **kwargs):
+    """
+    Адрес маршрута, как {% url %}, но без перебора шаблонов резолвера.
+    Поддерживает и форму {% blog_url ... as var %}.
+    """
+    builder = context.render_context.get(URLBuilder)
+    if builder is None:
+        builder = context.render_context[URLBuilder] = URLBuilder()
+    return builder(viewname, *args, **kwargs)
@@ -0,0 +1,131 @@
+"""
+Быстрая сборка адресов маршрутов blog:.
+
+Шаблоны маршрутов блога постоянны, поэтому один раз на процесс
+из резолвера берутся готовые строки формата вроде
+'posts/%(post_id)s/' и регулярные выражения конвертеров. Сборка адреса —
+проверка аргументов и подстановка в строку, без перебора вариантов
+маршрута, как в reverse(). Результат совпадает с reverse(); всё, что
+быстрый путь не поддерживает, отдаётся reverse().
+"""
+import re
+import threading
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.urls import get_resolver, get_script_prefix, get_urlconf, reverse
+from django.urls.converters import IntConverter, SlugConverter
+
+NAMESPACE = 'blog'
+
+# Значения этих конвертеров не требуют экранирования в адресе.
+SAFE_CONVERTERS = (IntConverter, SlugConverter)
+
+_lock = threading.Lock()
+_routes = {}
+
+
+class Route:
+    """Маршрут, собираемый подстановкой в строку формата."""
+
+    def __init__(self, path_format, params, converters):
+        self.path_format = path_format
+        self.params = params
+        self.checks = {
+            name: (
+                converters[name].to_url,
+                re.compile(converters[name].regex).fullmatch,
+            )
+            for name in params
+        }
+
+    def build(self, args, kwargs):
+        """Путь без префикса скрипта; None — если аргументы не подходят."""
+        if args:
+            if kwargs or len(args) != len(self.params):
+                return None
+            kwargs = dict(zip(self.params, args))
+        elif kwargs.keys() != self.checks.keys():
+            return None
+        values = {}
+        for name, value in kwargs.items():
+            to_url, match = self.checks[name]
+            # Как в reverse(): результат конвертера подставляется
+            # в шаблон через str(), например объект пользователя.
+            text = str(to_url(value))
+            if match(text) is None:
+                return None
+            values[name] = text
+        return self.path_format % values
+
+
+def _compile_routes(urlconf):
+    routes = {}
+    resolver = get_resolver(urlconf)
+    if NAMESPACE not in resolver.namespace_dict:
+        return routes
+    prefix, namespace_resolver = resolver.namespace_dict[NAMESPACE]
+    if re.fullmatch(r'[\w/-]*', prefix) is None:
+        return routes
+    for name in namespace_resolver.reverse_dict:
+        if not isinstance(name, str):
+            continue
+        variants = namespace_resolver.reverse_dict.getlist(name)
+        if len(variants) != 1:
+            continue
+        possibilities, pattern, defaults, converters = variants[0]
+        if len(possibilities) != 1 or defaults:
+            continue
+        path_format, params = possibilities[0]
+        if set(converters) != set(params) or not all(
+            isinstance(converter, SAFE_CONVERTERS)
+            for converter in converters.values()
+        ):
+            continue
+        routes[f'{NAMESPACE}:{name}'] = Route(
+            prefix + path_format, params, converters
+        )
+    return routes
+
+
+def get_routes():
+    """Скомпилированные маршруты для текущей конфигурации адресов."""
+    urlconf = get_urlconf()
+    routes = _routes.get(urlconf)
+    if routes is None:
+        with _lock:
+            routes = _routes.get(urlconf)
+            if routes is None:
+                routes = _routes[urlconf] = _compile_routes(urlconf)
+    return routes
+
+
+@receiver(setting_changed)
+def clear_routes(setting=None, **kwargs):
+    if setting in (None, 'ROOT_URLCONF'):
+        _routes.clear()
+
+
+class URLBuilder:
+    """
+    Сборщик адресов с запомненными маршрутами и префиксом скрипта.
+    Оба значения живут в локальных для потока переменных, чтение которых
+    дороже самой сборки, поэтому сборщик создают один раз на рендеринг.
+    """
+
+    def __init__(self):
+        self.routes = get_routes()
+        self.prefix = get_script_prefix()
+
+    def __call__(self, viewname, *args, **kwargs):
+        route = self.routes.get(viewname)
+        if route is not None:
+            path = route.build(args, kwargs)
+            if path is not None:
+                return self.prefix + path
+        return reverse(viewname, args=args or None, kwargs=kwargs or None)
+
+
+def build_url(viewname, *args, **kwargs):
+    """То же, что reverse(viewname, args=args, kwargs=kwargs)."""
+    return URLBuilder()(viewname, *args, **kwargs)
@@ -10,6 +10,11 @@ urlpatterns = [
         views.IndexListView.as_view(),
         name='index'
     ),
+    path(
+        'search/',
+        views.SearchListView.as_view(),
+        name='search'
+    ),
     path(
         'posts/<int:post_id>/',
         views.PostDetailView.as_view(),
@@ -35,6 +40,11 @@ urlpatterns = [
         views.CommentCreateView.as_view(),
         name='add_comment',
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.CommentListView.as_view(),
+        name='comments',
+    ),
     path(
         'posts/<int:post_id>/edit_comment/<int:comment_id>/',
         views.EditCommentUpdateView.as_view(),
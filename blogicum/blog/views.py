@@ -1,7 +1,8 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count, Q
-from django.utils import timezone
+from django.http import Http404
+from django.utils.http import urlencode
 from django.views.generic import (
     CreateView,
     ListView,
@@ -11,54 +12,208 @@ from django.views.generic import (
 )
 from django.shortcuts import get_object_or_404
 
+from .cards import (
+    category_version_key,
+    post_card_version_keys,
+    post_version_key,
+    user_version_key,
+)
+from .dimensions import get_dimensions
+from .missing import get_object_or_404_remembered
 from .mixins import (
     CommentDispacthMixin,
+    ConditionalGetMixin,
+    FeedPaginationMixin,
+    PostCardsMixin,
     PostDispatchMixin,
+    QueryBudgetMixin,
+    SharedPageCacheMixin,
+    SingleWriterMixin,
     URLPostMixin,
     URLProfileMixin,
 )
 from .forms import CommentForm, UserForm, PostForm
-from .models import Post, Category, Comment
+from .models import Post, Comment
+from .pagecache import (
+    FEED_VERSION_KEY,
+    author_posts_version_key,
+    category_posts_version_key,
+    posts_dependencies,
+    seconds_until_next_publication,
+)
+from .paginators import CursorPaginator
+from .search import get_search_backend
 
 POST_PER_PAGE: int = 10
-
-DATENOW = timezone.now()
+COMMENTS_PER_PAGE: int = 50
 
 User = get_user_model()
 
 
-class IndexListView(ListView):
+class IndexListView(
+    ConditionalGetMixin,
+    SharedPageCacheMixin,
+    QueryBudgetMixin,
+    FeedPaginationMixin,
+    PostCardsMixin,
+    ListView
+):
     """Главная страница."""
     model = Post
     paginate_by = POST_PER_PAGE
+    query_budget = 2
     template_name = 'blog/index.html'
 
-    def get_queryset(self):
-        return Post.objects.filter(
-            Q(pub_date__lte=DATENOW)
-            & Q(is_published=True)
-            & Q(category__is_published=True)
-        ).order_by('-pub_date').annotate(comment_count=Count('comment'))
+    def get_count_cache_key(self):
+        return 'index'
+
+    def get_page_cache_keys(self):
+        return [FEED_VERSION_KEY]
+
+    def get_validator_dependencies(self, posts):
+        return [FEED_VERSION_KEY] + posts_dependencies(posts)
 
+    def get_page_cache_dependencies(self, context):
+        return self.get_validator_dependencies(context['object_list'])
 
-class PostDetailView(DetailView):
+    def get_page_cache_timeout(self):
+        return seconds_until_next_publication(
+            Post.objects.all(),
+            settings.BLOG_PAGE_CACHE_TIMEOUT,
+        )
+
+    def get_base_queryset(self):
+        return Post.published.visible().order_by('-pub_date')
+
+
+class PostDetailView(
+    ConditionalGetMixin,
+    SharedPageCacheMixin,
+    QueryBudgetMixin,
+    DetailView
+):
     """Страница поста."""
     model = Post
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
+    query_budget = 2
+
+    def get_queryset(self):
+        return Post.published.select_related('author').with_dimensions()
+
+    def get_object(self, queryset=None):
+        return get_object_or_404_remembered(
+            'post',
+            self.kwargs['post_id'],
+            self.get_queryset(),
+            pk=self.kwargs['post_id'],
+        )
+
+    def get_validator_rows(self):
+        post = get_object_or_404_remembered(
+            'post',
+            self.kwargs['post_id'],
+            Post.published.validators(),
+            pk=self.kwargs['post_id'],
+        )
+        comments = CursorPaginator(
+            Comment.objects.filter(post_id=post.pk).only(
+                'updated_at', 'author'
+            ),
+            COMMENTS_PER_PAGE,
+            CommentListView.cursor_ordering,
+        ).page()
+        return [post, *comments.object_list]
+
+    def get_page_cache_keys(self):
+        return [post_version_key(self.kwargs['post_id'])]
+
+    def get_validator_dependencies(self, rows):
+        post, *comments = rows
+        return post_card_version_keys(post) + [
+            user_version_key(comment.author_id) for comment in comments
+        ]
+
+    def get_page_cache_dependencies(self, context):
+        return post_card_version_keys(self.object) + [
+            user_version_key(comment.author_id)
+            for comment in context['comments']
+        ]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = (Comment.objects.select_related(
-            'author'
-        ).filter(
-            post_id=self.kwargs['post_id']
-        ))
+        context['post_id'] = self.object.pk
+        context['comments'] = CursorPaginator(
+            Comment.objects.select_related('author').filter(
+                post_id=self.object.pk
+            ),
+            COMMENTS_PER_PAGE,
+            CommentListView.cursor_ordering,
+        ).page()
+        return context
+
+
+class CommentListView(FeedPaginationMixin, ListView):
+    """Следующая порция комментариев к посту: HTML-фрагмент."""
+    model = Comment
+    paginate_by = COMMENTS_PER_PAGE
+    template_name = 'includes/comment_list.html'
+    cursor_ordering = ('created_at', 'id')
+
+    def get_pagination_mode(self):
+        return 'cursor'
+
+    def get_queryset(self):
+        # Пост ищется так же, как на его странице: фрагмент не отдаёт
+        # комментарии к посту, которого там не показали бы.
+        self.post = get_object_or_404_remembered(
+            'post',
+            self.kwargs['post_id'],
+            Post.published.only('pk'),
+            pk=self.kwargs['post_id'],
+        )
+        return Comment.objects.select_related('author').filter(
+            post_id=self.post.pk
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['post_id'] = self.post.pk
+        context['comments'] = context['page_obj']
+        return context
+
+
+class SearchListView(FeedPaginationMixin, ListView):
+    """Поиск по постам."""
+    model = Post
+    paginate_by = POST_PER_PAGE
+    template_name = 'blog/search.html'
+
+    def get_pagination_mode(self):
+        # Результаты упорядочены по релевантности, а не по дате.
+        return 'offset'
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        queryset, self.terms = get_search_backend().search(
+            Post.published.visible().select_related(
+                'author'
+            ).with_dimensions(),
+            self.query,
+        )
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        get_search_backend().snippets(context['object_list'], self.terms)
+        context['query'] = self.query
+        context['page_query'] = urlencode({'q': self.query}) + '&'
         return context
 
 
 class CreatePostCreateView(
+    SingleWriterMixin,
     URLProfileMixin,
     LoginRequiredMixin,
     CreateView
@@ -74,6 +229,7 @@ class CreatePostCreateView(
 
 
 class EditPostUpdateView(
+    SingleWriterMixin,
     PostDispatchMixin,
     URLPostMixin,
     LoginRequiredMixin,
@@ -92,6 +248,7 @@ class EditPostUpdateView(
 
 
 class DeletePostDeleteView(
+    SingleWriterMixin,
     PostDispatchMixin,
     URLProfileMixin,
     LoginRequiredMixin,
@@ -104,10 +261,18 @@ class DeletePostDeleteView(
     pk_url_kwarg = 'post_id'
 
 
-class CategoryPostsListView(ListView):
+class CategoryPostsListView(
+    ConditionalGetMixin,
+    SharedPageCacheMixin,
+    QueryBudgetMixin,
+    FeedPaginationMixin,
+    PostCardsMixin,
+    ListView
+):
     """Страница с категориями."""
     model = Post
     paginate_by = POST_PER_PAGE
+    query_budget = 2
     template_name = 'blog/category.html'
     slug_url_kwarg = 'category_slug'
 
@@ -116,35 +281,95 @@ class CategoryPostsListView(ListView):
         context['category'] = self.category
         return context
 
-    def get_queryset(self):
-        self.category = get_object_or_404(
-            Category.objects.filter(
-                Q(slug=self.kwargs['category_slug'])
-                & Q(is_published=True)
-            ),
-            slug=self.kwargs['category_slug']
-        )
-        return Post.objects.all().filter(
-            Q(pub_date__lte=DATENOW)
-            & Q(category__slug=self.kwargs['category_slug'])
-            & Q(is_published=True)
-        ).order_by('-pub_date').annotate(comment_count=Count('comment'))
+    def get_count_cache_key(self):
+        return f'category:{self.category.pk}'
 
+    def get_page_cache_keys(self):
+        category = get_dimensions().category_by_slug(
+            self.kwargs['category_slug']
+        )
+        if category is None:
+            return []
+        return [
+            category_posts_version_key(category.pk),
+            category_version_key(category.pk),
+        ]
+
+    def get_validator_dependencies(self, posts):
+        return [
+            category_posts_version_key(self.category.pk),
+            category_version_key(self.category.pk),
+        ] + posts_dependencies(posts)
+
+    def get_page_cache_dependencies(self, context):
+        return self.get_validator_dependencies(context['object_list'])
+
+    def get_page_cache_timeout(self):
+        return seconds_until_next_publication(
+            Post.objects.filter(category=self.category),
+            settings.BLOG_PAGE_CACHE_TIMEOUT,
+        )
 
-class ProfileListView(ListView):
+    def get_base_queryset(self):
+        self.category = get_dimensions().category_by_slug(
+            self.kwargs['category_slug']
+        )
+        if self.category is None or not self.category.is_published:
+            raise Http404('Категория не найдена.')
+        return Post.published.visible().filter(
+            category=self.category
+        ).order_by('-pub_date')
+
+
+class ProfileListView(
+    ConditionalGetMixin,
+    SharedPageCacheMixin,
+    QueryBudgetMixin,
+    FeedPaginationMixin,
+    PostCardsMixin,
+    ListView
+):
     """Страница профиля."""
     model = User
     paginate_by = POST_PER_PAGE
+    query_budget = 3
     template_name = 'blog/profile.html'
     slug_url_kwarg = 'username'
-
-    def get_queryset(self):
-        self.author = get_object_or_404(User, username=self.kwargs['username'])
-        return Post.objects.all().filter(
-            author=self.author
-        ).order_by('-pub_date').annotate(
-            comment_count=Count('comment')
-        )
+    author = None
+
+    def get_count_cache_key(self):
+        return f'profile:{self.author.pk}'
+
+    def get_author(self):
+        if self.author is None:
+            self.author = get_object_or_404_remembered(
+                'profile',
+                self.kwargs['username'],
+                User,
+                username=self.kwargs['username'],
+            )
+        return self.author
+
+    def get_page_cache_keys(self):
+        author = self.get_author()
+        return [
+            author_posts_version_key(author.pk),
+            user_version_key(author.pk),
+        ]
+
+    def get_validator_dependencies(self, posts):
+        return [
+            author_posts_version_key(self.author.pk),
+            user_version_key(self.author.pk),
+        ] + posts_dependencies(posts)
+
+    def get_page_cache_dependencies(self, context):
+        return self.get_validator_dependencies(context['object_list'])
+
+    def get_base_queryset(self):
+        return Post.published.for_author(
+            self.get_author()
+        ).order_by('-pub_date')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -153,6 +378,7 @@ class ProfileListView(ListView):
 
 
 class ProfilUpdateView(
+    SingleWriterMixin,
     URLProfileMixin,
     LoginRequiredMixin,
     UpdateView
@@ -170,6 +396,7 @@ class ProfilUpdateView(
 
 
 class CommentCreateView(
+    SingleWriterMixin,
     URLPostMixin,
     LoginRequiredMixin,
     CreateView
@@ -191,6 +418,7 @@ class CommentCreateView(
 
 
 class EditCommentUpdateView(
+    SingleWriterMixin,
     CommentDispacthMixin,
     URLPostMixin,
     LoginRequiredMixin,
@@ -204,6 +432,7 @@ class EditCommentUpdateView(
 
 
 class DeleteCommentDeleteView(
+    SingleWriterMixin,
     CommentDispacthMixin,
     URLPostMixin,
     LoginRequiredMixin,
@@ -19,6 +19,9 @@ SECRET_KEY = 'django-insecure-u@8^1oe6_z6=5qi%@dxuacl%jgtb@(vujpnk+f@b30(j9yfsdp
 
 DEBUG = True
 
+# Падать с ошибкой, если страница превысила бюджет запросов к БД.
+QUERY_BUDGET_ENFORCED = DEBUG
+
 ALLOWED_HOSTS = [
     'localhost',
     '127.0.0.1',
@@ -42,10 +45,11 @@ STATICFILES_DIRS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'blog.middleware.ReplicaStickinessMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blog.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -81,6 +85,15 @@ DATABASES = {
     }
 }
 
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+
+# Псевдонимы реплик из DATABASES, с которых читают ленты и посты.
+BLOG_REPLICA_DATABASES = []
+
+# Сколько секунд после записи читать только из основной БД.
+BLOG_REPLICA_STICKY_SECONDS = 10
+BLOG_PRIMARY_COOKIE = 'use_primary'
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -106,6 +119,14 @@ LOGIN_REDIRECT_URL = 'blog:index'
 
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 
+# Отдавать статические страницы и страницы ошибок, отрисованные один раз,
+# без шаблонов, сессии и БД.
+PRERENDERED_PAGES = not DEBUG
+PRERENDERED_PAGES_MAX_AGE = 60 * 60 * 24
+
+# Сколько отсутствующих профилей и постов помнить в каждом процессе.
+BLOG_MISSING_CACHE_SIZE = 10000
+
 LANGUAGE_CODE = 'ru-RU'
 
 TIME_ZONE = 'UTC'
@@ -119,3 +140,31 @@ USE_TZ = True
 STATIC_URL = '/static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Пагинация лент: 'offset' — по номерам страниц, 'cursor' — по курсору.
+BLOG_PAGINATION_MODE = 'offset'
+
+# Через сколько секунд пересчитывать в фоне размер ленты для пагинатора.
+BLOG_COUNT_CACHE_TIMEOUT = 60
+
+# Сколько секунд хранить HTML карточки поста в кеше.
+BLOG_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Сколько секунд процесс держит категории и местоположения в памяти,
+# даже если версия справочников не менялась.
+BLOG_DIMENSIONS_MAX_AGE = 60 * 5
+
+# Сколько секунд хранить в кеше пользователя сессии.
+BLOG_AUTH_USER_CACHE_TIMEOUT = 60 * 60
+
+# PRAGMA для новых соединений с SQLite и файл, на котором запросы
+# на запись ждут друг друга (см. blog.db). В разработке не нужны.
+BLOG_SQLITE_PRAGMAS = {}
+BLOG_SQLITE_WRITE_LOCK = None
+
+# Поиск по постам: FTS5Backend для SQLite, SimpleBackend для других СУБД.
+BLOG_SEARCH_BACKEND = 'blog.search.FTS5Backend'
+
+# Кеш страниц целиком, общий для всех посетителей.
+BLOG_PAGE_CACHE_ENABLED = not DEBUG
+BLOG_PAGE_CACHE_TIMEOUT = 60 * 60 * 24
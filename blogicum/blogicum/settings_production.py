@@ -0,0 +1,137 @@
+"""
+Настройки для боевого сервера.
+
+Подключаются переменной окружения
+DJANGO_SETTINGS_MODULE=blogicum.settings_production.
+Секретный ключ, имена хостов и адреса memcached берутся из окружения.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, TEMPLATES
+
+
+def env_list(name, default=''):
+    return [
+        item.strip()
+        for item in os.environ.get(name, default).split(',')
+        if item.strip()
+    ]
+
+
+DEBUG = os.environ.get('DJANGO_DEBUG', '').lower() in ('1', 'true', 'yes')
+
+if DEBUG:
+    raise ImproperlyConfigured(
+        'Боевые настройки не запускаются с DEBUG: в этом режиме Django '
+        'хранит все SQL-запросы в памяти и не кеширует шаблоны.'
+    )
+
+try:
+    SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+except KeyError:
+    raise ImproperlyConfigured(
+        'Задайте секретный ключ в переменной окружения DJANGO_SECRET_KEY.'
+    )
+
+ALLOWED_HOSTS = env_list('DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1')
+
+# Шаблоны компилируются один раз на процесс.
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            'context_processors': [
+                processor
+                for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+                if processor != 'django.template.context_processors.debug'
+            ],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+DB_NAME = os.environ.get('DJANGO_DB_NAME', str(BASE_DIR / 'db.sqlite3'))
+
+# Транзакции сразу берут блокировку записи и ждут её busy_timeout
+# (см. blog.backends.sqlite3).
+DATABASES = {
+    'default': {
+        'ENGINE': 'blog.backends.sqlite3',
+        'NAME': DB_NAME,
+        'CONN_MAX_AGE': int(os.environ.get('DJANGO_CONN_MAX_AGE', 60)),
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+    }
+}
+
+# Реплики для чтения: пути к копиям файла БД через запятую.
+# Копии обновляет manage.py refresh_replicas.
+BLOG_REPLICA_DATABASES = []
+for number, path in enumerate(env_list('DJANGO_DB_REPLICAS'), start=1):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': path,
+        'OPTIONS': {},
+        'TEST': {'MIRROR': 'default'},
+    }
+    BLOG_REPLICA_DATABASES.append(alias)
+
+# Читатели не ждут писателя (WAL), файл БД отображается в память,
+# а любой писатель ждёт блокировку до 5 секунд вместо мгновенной ошибки.
+BLOG_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,
+}
+
+# Представления блога, которые пишут, ждут своей очереди без ограничения
+# по времени.
+BLOG_SQLITE_WRITE_LOCK = os.environ.get(
+    'DJANGO_DB_WRITE_LOCK', DB_NAME + '.write-lock'
+)
+
+# Версии ключей кеша сбрасываются сигналами в одном процессе, поэтому
+# кеш должен быть общим для всех процессов: memcached (пакет pymemcache).
+# С кешем в памяти процесса остальные процессы отдавали бы устаревшие
+# страницы до истечения BLOG_PAGE_CACHE_TIMEOUT.
+CACHE_LOCATION = env_list('DJANGO_CACHE_LOCATION')
+
+if not CACHE_LOCATION:
+    raise ImproperlyConfigured(
+        'Задайте адреса memcached в переменной окружения '
+        'DJANGO_CACHE_LOCATION: кеш страниц и версии ключей должны быть '
+        'общими для всех процессов.'
+    )
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': CACHE_LOCATION,
+    }
+}
+
+# Сессии читаются из кеша и сохраняются, только если изменились.
+SESSION_ENGINE = 'blog.sessions'
+SESSION_SAVE_EVERY_REQUEST = False
+
+STATIC_ROOT = os.environ.get('DJANGO_STATIC_ROOT', BASE_DIR / 'static')
+
+STATICFILES_STORAGE = (
+    'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+)
+
+QUERY_BUDGET_ENFORCED = False
+
+PRERENDERED_PAGES = True
+
+BLOG_PAGE_CACHE_ENABLED = True
@@ -0,0 +1,84 @@
+"""
+Статические страницы и страницы ошибок, отрисованные один раз.
+
+Шаблон рендерится при первом обращении в процессе с пробитой дырой
+шапки. Анонимному посетителю отдаются готовые байты со строгим ETag,
+и ни шаблоны, ни сессия, ни БД не используются. Посетителю с cookie
+сессии дыра шапки заполняется под него. Дыры, зависящие от самого
+запроса (адрес на странице 404), заполняются у всех.
+"""
+import hashlib
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest, HttpResponse
+from django.template.loader import render_to_string
+from django.urls import resolve, reverse
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers
+)
+
+from blog.holes import HOLE_RE, fill_holes
+
+
+USER_HOLES = {'header_user'}
+
+
+class Prerendered(NamedTuple):
+    content: str
+    anonymous: bytes
+    etag: Optional[str]
+
+
+def prerendered_enabled() -> bool:
+    return getattr(settings, 'PRERENDERED_PAGES', False)
+
+
+@lru_cache(maxsize=None)
+def prerender(template: str, view_name: Optional[str] = None) -> Prerendered:
+    """Рендерит страницу без пользователя."""
+    request = HttpRequest()
+    request.punch_holes = True
+    request.user = AnonymousUser()
+    if view_name:
+        request.path = reverse(view_name)
+        request.resolver_match = resolve(request.path)
+    content = render_to_string(template, request=request)
+    anonymous = fill_holes(content, request, names=USER_HOLES)
+    if HOLE_RE.search(anonymous):
+        return Prerendered(content, anonymous.encode(), None)
+    anonymous = anonymous.encode()
+    return Prerendered(
+        content,
+        anonymous,
+        '"{}"'.format(hashlib.md5(anonymous).hexdigest()),
+    )
+
+
+def prerendered_response(
+        request: HttpRequest, template: str, status: int = 200,
+        view_name: Optional[str] = None, max_age: int = 0) -> HttpResponse:
+    """
+    Ответ из заранее отрисованной страницы.
+    Анонимный вариант кешируется браузером и прокси на `max_age` секунд.
+    """
+    page = prerender(template, view_name)
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        response = HttpResponse(
+            fill_holes(page.content, request), status=status)
+        patch_cache_control(response, private=True, no_cache=True)
+    elif page.etag is None:
+        response = HttpResponse(
+            fill_holes(page.anonymous.decode(), request), status=status)
+    else:
+        response = HttpResponse(page.anonymous, status=status)
+        response['ETag'] = page.etag
+        if max_age:
+            patch_cache_control(response, public=True, max_age=max_age)
+        if status == 200:
+            response = get_conditional_response(
+                request, etag=page.etag, response=response)
+    patch_vary_headers(response, ('Cookie',))
+    return response
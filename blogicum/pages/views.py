@@ -1,14 +1,32 @@
+from django.conf import settings
 from django.views.generic import TemplateView
 from django.http import HttpResponse, HttpRequest
 from django.shortcuts import render
 
+from .prerendered import prerendered_enabled, prerendered_response
 
-class AboutTemplateView(TemplateView):
+
+class PrerenderedTemplateMixin:
+    """Отдаёт страницу, отрисованную один раз на процесс."""
+
+    def get(self, request, *args, **kwargs):
+        if not prerendered_enabled():
+            return super().get(request, *args, **kwargs)
+        return prerendered_response(
+            request,
+            self.template_name,
+            view_name=request.resolver_match.view_name,
+            max_age=getattr(
+                settings, 'PRERENDERED_PAGES_MAX_AGE', 60 * 60 * 24),
+        )
+
+
+class AboutTemplateView(PrerenderedTemplateMixin, TemplateView):
     """Страница о проекте."""
     template_name = 'pages/about.html'
 
 
-class RulesTemplateView(TemplateView):
+class RulesTemplateView(PrerenderedTemplateMixin, TemplateView):
     """Страница с правилами проекта."""
     template_name = 'pages/rules.html'
 
@@ -16,6 +34,8 @@ class RulesTemplateView(TemplateView):
 def csrf_failure(request: HttpRequest, reason='') -> HttpResponse:
     """Ошибка проверки CSRF: 403."""
     template = 'pages/403csrf.html'
+    if prerendered_enabled():
+        return prerendered_response(request, template, status=403)
     return render(
         request,
         template,
@@ -26,6 +46,8 @@ def csrf_failure(request: HttpRequest, reason='') -> HttpResponse:
 def page_not_found(request: HttpRequest, exception) -> HttpResponse:
     """Ошибка страница не найдена: 404."""
     template = 'pages/404.html'
+    if prerendered_enabled():
+        return prerendered_response(request, template, status=404)
     return render(
         request,
         template,
@@ -36,6 +58,8 @@ def page_not_found(request: HttpRequest, exception) -> HttpResponse:
 def server_error(request: HttpRequest) -> HttpResponse:
     """Ошибка сервера: 500."""
     template = 'pages/500.html'
+    if prerendered_enabled():
+        return prerendered_response(request, template, status=500)
     return render(
         request,
         template,
@@ -32,6 +32,46 @@ def enable_debug_false():
         yield
 
 
+DB_FIXTURES = ('db', 'transactional_db', 'django_db_reset_sequences')
+
+
+@pytest.fixture(autouse=True)
+def commit_test_transaction(request, monkeypatch):
+    """
+    Тест идёт внутри транзакции, которая откатывается, и
+    transaction.on_commit не срабатывает никогда. Вне собственных
+    транзакций кода обработчики выполняются сразу, как в автокоммите;
+    внутри них — как обычно, после фиксации.
+    """
+    if not (
+        request.node.get_closest_marker('django_db')
+        or set(DB_FIXTURES) & set(request.fixturenames)
+    ):
+        yield
+        return
+    request.getfixturevalue('_django_db_helper')
+    from django.db import connections, transaction
+
+    def depth(connection):
+        return connection.in_atomic_block + len(connection.savepoint_ids)
+
+    depths = {
+        connection.alias: depth(connection)
+        for connection in connections.all()
+    }
+    on_commit = transaction.on_commit
+
+    def run_outside_atomic(func, using=None):
+        connection = transaction.get_connection(using)
+        if depth(connection) <= depths.get(connection.alias, 0):
+            func()
+        else:
+            on_commit(func, using)
+
+    monkeypatch.setattr(transaction, 'on_commit', run_outside_atomic)
+    yield
+
+
 class SafeImportFromContextManager:
 
     def __init__(self, import_path: str,
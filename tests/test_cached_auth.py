@@ -0,0 +1,97 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+
+def user_queries(client, url='/pages/rules/'):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'FROM "auth_user"' in query['sql']
+    ]
+
+
+def test_anonymous_request_skips_database(client, django_assert_num_queries):
+    with django_assert_num_queries(0):
+        client.get('/pages/rules/')
+
+
+def test_session_user_is_cached(user_client):
+    user_queries(user_client)
+    assert not user_queries(user_client), (
+        'Убедитесь, что пользователь сессии берётся из кеша.'
+    )
+
+
+def test_profile_edit_resets_cached_user(user, user_client):
+    user_queries(user_client)
+    response = user_client.post(
+        f'/edit_profile/{user.username}/',
+        {
+            'username': 'renamed_user',
+            'first_name': 'Имя',
+            'last_name': 'Фамилия',
+            'email': 'renamed@example.com',
+        },
+    )
+    assert response.status_code == 302
+    content = user_client.get('/pages/rules/').content.decode()
+    assert 'renamed_user' in content, (
+        'Убедитесь, что после правки профиля закешированный пользователь '
+        'сессии обновляется.'
+    )
+
+
+def test_password_change_logs_out_other_sessions(user, user_client):
+    user_queries(user_client)
+    user.set_password('new-password-123')
+    user.save()
+    response = user_client.get('/posts/create/')
+    assert response.status_code == 302, (
+        'Убедитесь, что после смены пароля закешированный пользователь '
+        'не открывает страницы для вошедших.'
+    )
+
+
+def test_session_not_modified_by_same_value():
+    from blog.sessions import SessionStore
+
+    session = SessionStore()
+    session['theme'] = 'dark'
+    session.save()
+    session = SessionStore(session.session_key)
+    session['theme'] = 'dark'
+    assert not session.modified, (
+        'Убедитесь, что запись того же значения не помечает сессию '
+        'изменённой.'
+    )
+    session['theme'] = 'light'
+    assert session.modified
+    session['theme'] = 'dark'
+    assert session['theme'] == 'dark' and session.modified, (
+        'Убедитесь, что возврат к загруженному значению после изменения '
+        'сохраняет сессию.'
+    )
+
+
+def test_session_saves_value_mutated_in_place():
+    from blog.sessions import SessionStore
+
+    session = SessionStore()
+    session['cart'] = [1]
+    session.save()
+    session = SessionStore(session.session_key)
+    cart = session['cart']
+    cart.append(2)
+    session['cart'] = cart
+    assert session.modified, (
+        'Убедитесь, что изменённый на месте список сохраняется в сессии.'
+    )
+    session.save()
+    assert SessionStore(session.session_key)['cart'] == [1, 2]
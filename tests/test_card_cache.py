@@ -0,0 +1,101 @@
+import pytest
+from django.test import override_settings
+from mixer.backend.django import Mixer
+
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+
+@pytest.fixture
+def card_post(mixer: Mixer, user):
+    category = mixer.blend('blog.Category', is_published=True)
+    location = mixer.blend('blog.Location', is_published=True)
+    return mixer.blend(
+        'blog.Post', author=user, category=category, location=location,
+        is_published=True)
+
+
+def test_cards_are_served_from_cache(client, card_post):
+    from blog.cards import card_cache_stats, reset_card_cache_stats
+
+    reset_card_cache_stats()
+    client.get('/')
+    client.get('/')
+    assert card_cache_stats() == {'hits': 1, 'misses': 1}, (
+        'Убедитесь, что карточка поста при повторном показе '
+        'берётся из кеша.'
+    )
+
+
+@pytest.mark.parametrize('change', [
+    'post', 'category', 'location', 'author', 'comment'])
+def test_card_is_invalidated(client, mixer: Mixer, card_post, change):
+    client.get('/')
+    if change == 'post':
+        card_post.title = 'Новый заголовок поста'
+        card_post.save()
+        expected = card_post.title
+    elif change == 'category':
+        card_post.category.title = 'Новое название категории'
+        card_post.category.save()
+        expected = card_post.category.title
+    elif change == 'location':
+        card_post.location.name = 'Новое место'
+        card_post.location.save()
+        expected = card_post.location.name
+    elif change == 'author':
+        card_post.author.username = 'renamed_author'
+        card_post.author.save()
+        expected = '@renamed_author'
+    else:
+        mixer.blend('blog.Comment', post=card_post)
+        expected = 'Комментарии (1)'
+    content = client.get('/').content.decode()
+    assert expected in content, (
+        'Убедитесь, что карточка поста перерисовывается при изменении '
+        'поста, его категории, местоположения, автора или комментариев.'
+    )
+
+
+def test_card_version_is_bumped_after_commit(
+        card_post, django_capture_on_commit_callbacks):
+    from django.db import transaction
+
+    from blog.cache import get_versions
+    from blog.cards import post_version_key
+
+    key = post_version_key(card_post.pk)
+    before = get_versions([key])[key]
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            card_post.title = 'Новый заголовок поста'
+            card_post.save()
+            assert get_versions([key])[key] == before, (
+                'Убедитесь, что версия карточки увеличивается только '
+                'после фиксации транзакции: иначе параллельный запрос '
+                'закеширует старый пост под новой версией.'
+            )
+    assert get_versions([key])[key] != before
+
+
+@override_settings(QUERY_BUDGET_ENFORCED=False)
+def test_post_saved_during_render_is_not_cached(
+        client, card_post, monkeypatch):
+    import blog.cards
+
+    real_get_versions = blog.cards.get_versions
+
+    def save_then_get_versions(keys):
+        # Пост сохранён после чтения строк ленты, но до чтения версий.
+        monkeypatch.setattr(blog.cards, 'get_versions', real_get_versions)
+        card_post.title = 'Новый заголовок поста'
+        card_post.save()
+        return real_get_versions(keys)
+
+    monkeypatch.setattr(blog.cards, 'get_versions', save_then_get_versions)
+    client.get('/')
+    assert card_post.title in client.get('/').content.decode(), (
+        'Убедитесь, что карточка, прочитанная до сохранения поста, '
+        'не попадает в кеш под новыми версиями.'
+    )
@@ -0,0 +1,36 @@
+import pytest
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+
+def test_comment_count_follows_comments(mixer: Mixer, PostModel):
+    post = mixer.blend('blog.Post')
+    comments = mixer.cycle(3).blend('blog.Comment', post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        'Убедитесь, что при создании комментария увеличивается '
+        'счётчик `comment_count` публикации.'
+    )
+    comments[0].delete()
+    post.comment.all().delete()
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        'Убедитесь, что при удалении комментариев, в том числе массовом, '
+        'уменьшается счётчик `comment_count` публикации.'
+    )
+
+
+def test_recount_comments_fixes_drift(mixer: Mixer, PostModel):
+    post = mixer.blend('blog.Post')
+    mixer.cycle(2).blend('blog.Comment', post=post)
+    PostModel.objects.filter(pk=post.pk).update(comment_count=10)
+    call_command('recount_comments', batch_size=1)
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        'Убедитесь, что команда `recount_comments` исправляет '
+        'расхождения счётчика комментариев.'
+    )
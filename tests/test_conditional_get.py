@@ -0,0 +1,133 @@
+import pytest
+from django.test import override_settings
+from mixer.backend.django import Mixer
+
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+
+@pytest.fixture
+def post(mixer: Mixer):
+    category = mixer.blend('blog.Category', is_published=True)
+    return mixer.blend('blog.Post', category=category, is_published=True)
+
+
+@pytest.fixture
+def urls(post):
+    return [
+        '/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{post.author.username}/',
+        f'/posts/{post.id}/',
+    ]
+
+
+def assert_not_modified(client, url, response):
+    assert response.status_code == 200
+    etag = response['ETag']
+    not_modified = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert not_modified.status_code == 304, (
+        f'Убедитесь, что страница `{url}` отвечает 304 Not Modified, '
+        'если её ETag не изменился.'
+    )
+    # Из кеша страниц тело заполняется мелкими шаблонами дыр.
+    assert not [
+        template for template in not_modified.templates
+        if not template.name.startswith('includes/holes/')
+    ], f'Убедитесь, что ответ 304 для `{url}` не рендерит страницу.'
+    return etag
+
+
+def test_unchanged_pages_not_modified(client, urls):
+    for url in urls:
+        response = client.get(url)
+        assert_not_modified(client, url, response)
+        assert 'Last-Modified' not in response, (
+            'Убедитесь, что страница не отдаёт Last-Modified: updated_at '
+            'не меняется при новых комментариях и правке справочников.'
+        )
+
+
+def test_changes_update_etag(client, mixer: Mixer, post, urls):
+    etags = {url: assert_not_modified(client, url, client.get(url))
+             for url in urls}
+    post.title = 'Новый заголовок'
+    post.save()
+    for url in urls:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == 200, (
+            f'Убедитесь, что после изменения поста страница `{url}` '
+            'отдаётся заново.'
+        )
+        etags[url] = response['ETag']
+
+    url = f'/posts/{post.id}/'
+    comment = mixer.blend('blog.Comment', post=post)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+    assert response.status_code == 200, (
+        'Убедитесь, что новый комментарий меняет ETag страницы поста.'
+    )
+    comment.text = 'Исправленный комментарий'
+    comment.save()
+    assert client.get(
+        url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == 200, (
+        'Убедитесь, что правка комментария меняет ETag страницы поста.'
+    )
+
+
+def test_etag_depends_on_user(client, user_client, urls):
+    for url in urls:
+        etag = client.get(url)['ETag']
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f'Убедитесь, что ETag страницы `{url}` зависит от пользователя.'
+        )
+
+
+@override_settings(BLOG_PAGE_CACHE_ENABLED=True)
+def test_cached_pages_not_modified(client, urls, django_assert_num_queries):
+    from django.core.cache import cache
+
+    cache.clear()
+    for url in urls:
+        etag = assert_not_modified(client, url, client.get(url))
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+
+def test_etag_changes_after_rename(user, user_client, urls):
+    etags = {url: user_client.get(url)['ETag'] for url in urls}
+    user.username = 'renamed_user'
+    user.save()
+    for url in urls[:2]:
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == 200, (
+            f'Убедитесь, что после смены имени страница `{url}` отдаётся '
+            'заново: в шапке новое имя пользователя.'
+        )
+        assert 'renamed_user' in response.content.decode()
+
+
+@override_settings(BLOG_PAGE_CACHE_ENABLED=True)
+def test_cached_pages_not_modified_for_signed_in_user(
+        user, user_client, urls):
+    from django.core.cache import cache
+
+    cache.clear()
+    for url in urls:
+        etag = assert_not_modified(user_client, url, user_client.get(url))
+        assert user_client.get(url)['ETag'] == etag, (
+            f'Убедитесь, что ETag страницы `{url}` из кеша страниц '
+            'не зависит от csrf_token формы комментария.'
+        )
+    etags = {url: user_client.get(url)['ETag'] for url in urls}
+    user.username = 'renamed_user'
+    user.save()
+    for url in urls[:2]:
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == 200, (
+            f'Убедитесь, что после смены имени страница `{url}` из кеша '
+            'страниц отдаётся заново.'
+        )
@@ -0,0 +1,197 @@
+import io
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+
+pytestmark = [
+    pytest.mark.django_db(transaction=True),
+]
+
+
+def write_dump(path, records, as_array=True):
+    if as_array:
+        path.write_text(json.dumps(records, ensure_ascii=False, indent=2))
+    else:
+        path.write_text(
+            ''.join(json.dumps(record) + '\n' for record in records)
+        )
+    return str(path)
+
+
+@pytest.fixture
+def dump_records():
+    # Посты и комментарии раньше справочников и авторов: порядок
+    # в выгрузке не должен иметь значения.
+    return [
+        {'model': 'blog.comment', 'pk': 7, 'fields': {
+            'created_at': '2022-12-20T10:00:00Z', 'text': 'Согласен',
+            'post': 3, 'author': 2,
+        }},
+        {'model': 'blog.post', 'pk': 3, 'fields': {
+            'created_at': '2022-12-18T23:06:18Z', 'is_published': True,
+            'title': 'Обед', 'text': 'Обед у Морозовой.\n\nБыли Чупров и я.',
+            'pub_date': '1897-02-13T00:00:00Z', 'author': 2,
+            'category': 5, 'location': 4, 'comment_count': 100,
+            'obsolete_field': 'из старой схемы',
+        }},
+        {'model': 'admin.logentry', 'pk': 1, 'fields': {}},
+        {'model': 'blog.category', 'pk': 5, 'fields': {
+            'created_at': '2022-12-18T23:03:52Z', 'is_published': True,
+            'title': 'День как день', 'slug': 'routine',
+            'description': 'Обычные дни.',
+        }},
+        {'model': 'blog.location', 'pk': 4, 'fields': {
+            'created_at': '2022-12-18T23:00:36Z', 'is_published': True,
+            'name': 'Байона',
+        }},
+        {'model': 'auth.user', 'pk': 2, 'fields': {
+            'password': '!', 'username': 'leo', 'email': 'leo@ya.ru',
+            'date_joined': '2022-12-18T22:57:29Z', 'groups': [1],
+            'user_permissions': [],
+        }},
+    ]
+
+
+@pytest.mark.parametrize('skip_signals', [False, True])
+def test_import_dump(tmp_path, client, dump_records, skip_signals):
+    from django.contrib.auth.models import Group
+
+    from blog.models import Comment, Post
+    from blog.rendering import RENDERER_VERSION, render_text
+
+    Group.objects.create(pk=1, name='Авторы')
+    out = io.StringIO()
+    call_command(
+        'import_blog', write_dump(tmp_path / 'db.json', dump_records),
+        batch_size=2, skip_signals=skip_signals, stdout=out,
+    )
+    post = Post.objects.get()
+    assert post.created_at.isoformat() == '2022-12-18T23:06:18+00:00', (
+        'Убедитесь, что загрузка сохраняет даты создания из выгрузки.'
+    )
+    assert post.updated_at == post.created_at
+    assert post.comment_count == 1, (
+        'Убедитесь, что после загрузки счётчики комментариев пересчитаны.'
+    )
+    assert post.excerpt and post.text_html_version == RENDERER_VERSION
+    assert post.text_html == render_text(post.text)
+    assert Comment.objects.get().text_html_version == RENDERER_VERSION
+    assert list(
+        get_user_model().objects.get(username='leo').groups.all()
+    ) == [Group.objects.get()], 'Убедитесь, что загружаются связи m2m.'
+    assert 'записей/с' in out.getvalue()
+    assert 'Пропущено admin.logentry: 1.' in out.getvalue()
+    response = client.get('/search/', {'q': 'обед'})
+    assert list(response.context['object_list']) == [post], (
+        'Убедитесь, что загруженные посты попадают в поисковый индекс.'
+    )
+    response = client.get('/category/routine/')
+    assert post in response.context['page_obj'].object_list
+
+
+def test_import_jsonl_dump(tmp_path, dump_records):
+    from blog.models import Post
+
+    dump_records = [
+        record for record in dump_records
+        if record['model'] != 'auth.user'
+    ]
+    get_user_model().objects.create(pk=2, username='leo')
+    call_command(
+        'import_blog',
+        write_dump(tmp_path / 'db.jsonl', dump_records, as_array=False),
+        stdout=io.StringIO(),
+    )
+    assert Post.objects.filter(pk=3).exists()
+
+
+def test_import_rejects_broken_references(tmp_path, dump_records):
+    from blog.models import Category
+
+    dump_records = [
+        record for record in dump_records if record['model'] != 'auth.user'
+    ]
+    with pytest.raises(CommandError):
+        call_command(
+            'import_blog', write_dump(tmp_path / 'db.json', dump_records),
+            stdout=io.StringIO(),
+        )
+    assert not Category.objects.exists(), (
+        'Убедитесь, что при ошибке загрузка откатывается целиком.'
+    )
+
+
+@pytest.mark.parametrize('read_size', [1, 7, 4096])
+def test_iter_records_streams_in_chunks(read_size):
+    from blog.dumps import iter_records
+
+    records = [{'model': 'blog.location', 'pk': pk, 'fields': {
+        'name': 'Город {"с" скобками}, и запятой' * pk,
+    }} for pk in range(1, 20)]
+    stream = io.StringIO(json.dumps(records, ensure_ascii=False))
+    assert list(iter_records(stream, read_size)) == records
+
+
+def test_iter_records_reports_truncated_dump():
+    from blog.dumps import DumpError, iter_records
+
+    with pytest.raises(DumpError):
+        list(iter_records(io.StringIO('[{"model": "blog.post", "pk"'), 5))
+
+
+def test_import_rebuilds_in_target_database(
+        tmp_path, dump_records, monkeypatch):
+    from django.contrib.auth.models import Group
+
+    from blog.cache import get_versions
+    from blog.cards import CARDS_VERSION_KEY
+    from blog.management.commands import import_blog
+
+    Group.objects.create(pk=1, name='Авторы')
+    calls = []
+    monkeypatch.setattr(
+        import_blog, 'call_command',
+        lambda name, **options: calls.append((name, options['database'])),
+    )
+    before = get_versions([CARDS_VERSION_KEY])
+    call_command(
+        'import_blog', write_dump(tmp_path / 'db.json', dump_records),
+        database='default', skip_signals=True, stdout=io.StringIO(),
+    )
+    assert calls == [
+        ('recount_comments', 'default'), ('reindex_search', 'default')
+    ], (
+        'Убедитесь, что счётчики и поисковый индекс пересчитываются '
+        'в той БД, в которую шла загрузка.'
+    )
+    assert get_versions([CARDS_VERSION_KEY]) != before, (
+        'Убедитесь, что после загрузки без сигналов карточки постов '
+        'сбрасываются общей версией.'
+    )
+    for name in ('recount_comments', 'reindex_search'):
+        call_command(name, database='default', stdout=io.StringIO())
+
+
+def test_import_resets_caches_after_commit(
+        tmp_path, dump_records, monkeypatch):
+    from django.contrib.auth.models import Group
+    from django.db import connection
+
+    from blog.management.commands.import_blog import Command
+
+    Group.objects.create(pk=1, name='Авторы')
+    in_transaction = []
+    monkeypatch.setattr(
+        Command, 'reset_caches',
+        lambda self: in_transaction.append(connection.in_atomic_block),
+    )
+    call_command(
+        'import_blog', write_dump(tmp_path / 'db.json', dump_records),
+        stdout=io.StringIO(),
+    )
+    assert in_transaction == [False], (
+        'Убедитесь, что и с сигналами кеши сбрасываются после фиксации '
+        'загрузки: иначе читатели успеют закешировать прежние данные.'
+    )
@@ -0,0 +1,66 @@
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite',
+        reason='План запроса проверяется через EXPLAIN QUERY PLAN SQLite.'),
+]
+
+
+@pytest.fixture
+def post(mixer: Mixer, user):
+    category = mixer.blend('blog.Category', is_published=True)
+    posts = mixer.cycle(N_PER_PAGE).blend(
+        'blog.Post', author=user, category=category, is_published=True)
+    mixer.cycle(N_PER_PAGE).blend('blog.Comment', post=posts[0])
+    return posts[0]
+
+
+def get_view_queryset(view_class, **kwargs):
+    view = view_class()
+    view.setup(RequestFactory().get('/'), **kwargs)
+    return view.get_queryset()
+
+
+def assert_uses_index(queryset, table, view_name):
+    plan = queryset[:N_PER_PAGE].explain()
+    table_steps = [
+        step for step in plan.splitlines() if f' {table} ' in f'{step} ']
+    assert table_steps and all(
+        'USING INDEX' in step or 'USING COVERING INDEX' in step
+        for step in table_steps
+    ), (
+        f'Убедитесь, что основной запрос `{view_name}` читает `{table}` '
+        f'по индексу, а не полным просмотром таблицы. План:\n{plan}'
+    )
+    assert 'TEMP B-TREE' not in plan, (
+        f'Убедитесь, что сортировка основного запроса `{view_name}` '
+        f'берётся из индекса. План:\n{plan}'
+    )
+
+
+def test_feed_queries_use_indexes(post):
+    from blog import views
+
+    feeds = {
+        'IndexListView': get_view_queryset(views.IndexListView),
+        'CategoryPostsListView': get_view_queryset(
+            views.CategoryPostsListView,
+            category_slug=post.category.slug),
+        'ProfileListView': get_view_queryset(
+            views.ProfileListView, username=post.author.username),
+    }
+    for view_name, queryset in feeds.items():
+        assert_uses_index(queryset, 'blog_post', view_name)
+
+
+def test_comment_query_uses_index(post, CommentModel):
+    comments = CommentModel.objects.select_related('author').filter(
+        post_id=post.id)
+    assert_uses_index(comments, 'blog_comment', 'PostDetailView')
@@ -0,0 +1,61 @@
+import pytest
+from django.test import override_settings
+from mixer.backend.django import Mixer
+
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+
+def test_known_missing_pages_skip_database(
+        client, mixer: Mixer, django_assert_num_queries):
+    urls = ['/profile/no_such_user_404/', '/posts/987654/']
+    for url in urls:
+        assert client.get(url).status_code == 404
+    with override_settings(PRERENDERED_PAGES=True):
+        for url in urls:
+            with django_assert_num_queries(0):
+                response = client.get(url)
+            assert response.status_code == 404, (
+                f'Убедитесь, что повторный запрос `{url}` к отсутствующему '
+                'объекту отдаёт 404 без обращения к БД.'
+            )
+            assert 'Блогикум' in response.content.decode()
+
+    mixer.blend('auth.User', username='no_such_user_404')
+    assert client.get(urls[0]).status_code == 200, (
+        'Убедитесь, что кеш промахов сбрасывается при создании объекта.'
+    )
+
+
+@override_settings(BLOG_MISSING_CACHE_SIZE=2)
+def test_missing_cache_evicts_least_recently_used():
+    from blog.missing import is_known_missing, remember_missing
+
+    remember_missing('post', 1)
+    remember_missing('post', 2)
+    assert is_known_missing('post', 1)
+    remember_missing('post', 3)
+    assert is_known_missing('post', 1), (
+        'Убедитесь, что кеш промахов вытесняет давно не запрошенные '
+        'записи, а не самые старые.'
+    )
+    assert not is_known_missing('post', 2)
+
+
+def test_missing_posts_are_forgotten_after_commit(
+        mixer: Mixer, django_capture_on_commit_callbacks):
+    from django.db import transaction
+
+    from blog.missing import is_known_missing, remember_missing
+
+    remember_missing('post', 987654)
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            mixer.blend('blog.Post')
+            assert is_known_missing('post', 987654), (
+                'Убедитесь, что промахи забываются только после фиксации '
+                'транзакции: иначе промах, запомненный до неё, '
+                'переживёт создание поста.'
+            )
+    assert not is_known_missing('post', 987654)
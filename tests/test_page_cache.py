@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+
+@pytest.fixture(autouse=True)
+def page_cache():
+    cache.clear()
+    with override_settings(BLOG_PAGE_CACHE_ENABLED=True):
+        yield
+    cache.clear()
+
+
+@pytest.fixture
+def cached_post(mixer: Mixer, user):
+    category = mixer.blend('blog.Category', is_published=True)
+    return mixer.blend(
+        'blog.Post', author=user, category=category, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1))
+
+
+def get_urls(post):
+    return [
+        '/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{post.author.username}/',
+        f'/posts/{post.id}/',
+    ]
+
+
+def test_anonymous_pages_are_cached(
+        client, cached_post, django_assert_num_queries):
+    for url in get_urls(cached_post):
+        first = client.get(url)
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert second.content == first.content, (
+            f'Убедитесь, что страница `{url}` для анонимного посетителя '
+            'отдаётся из кеша.'
+        )
+
+
+def test_cached_pages_are_personalized(
+        another_user, user_client, another_user_client, cached_post,
+        django_assert_max_num_queries):
+    url = f'/posts/{cached_post.id}/'
+    edit_url = f'/posts/{cached_post.id}/edit/'
+    author_content = user_client.get(url).content.decode()
+    assert edit_url in author_content
+    assert '<!--hole:' not in author_content, (
+        'Убедитесь, что метки персональных участков заполняются '
+        'перед отдачей страницы.'
+    )
+
+    # Из кеша: только сессия и пользователь.
+    with django_assert_max_num_queries(2):
+        other_content = another_user_client.get(url).content.decode()
+    assert f'/profile/{another_user.username}/' in other_content, (
+        'Убедитесь, что шапка страницы из кеша заполняется '
+        'под текущего пользователя.'
+    )
+    assert edit_url not in other_content, (
+        'Убедитесь, что общий кеш страниц не показывает чужие '
+        'ссылки редактирования.'
+    )
+    assert 'csrfmiddlewaretoken' in other_content, (
+        'Убедитесь, что форма комментария из кеша получает CSRF-токен.'
+    )
+
+
+def test_page_cache_is_invalidated_precisely(
+        client, mixer: Mixer, cached_post, django_assert_num_queries):
+    urls = get_urls(cached_post)
+    for url in urls:
+        client.get(url)
+
+    other_category = mixer.blend('blog.Category', is_published=True)
+    new_post = mixer.blend(
+        'blog.Post', category=other_category, is_published=True,
+        pub_date=timezone.now() - timedelta(hours=1))
+    with django_assert_num_queries(0):
+        client.get(urls[1])
+        client.get(urls[3])
+    assert new_post.title in client.get(urls[0]).content.decode(), (
+        'Убедитесь, что новый пост сбрасывает кеш главной страницы.'
+    )
+
+    comment = mixer.blend('blog.Comment', post=cached_post)
+    for url in urls:
+        content = client.get(url).content.decode()
+        assert ('Комментарии (1)' in content
+                or f'comment_{comment.id}' in content), (
+            f'Убедитесь, что новый комментарий сбрасывает кеш `{url}`.'
+        )
+
+
+def test_write_during_render_is_not_cached(
+        client, cached_post, monkeypatch):
+    import blog.mixins
+
+    real_cache_page = blog.mixins.cache_page
+    for number, url in enumerate(get_urls(cached_post)):
+        title = f'Заголовок {number}'
+
+        def save_then_cache(*args, title=title, **kwargs):
+            # Пост сохранён после чтения страницы, но до её записи в кеш.
+            cached_post.title = title
+            cached_post.save()
+            real_cache_page(*args, **kwargs)
+
+        monkeypatch.setattr(blog.mixins, 'cache_page', save_then_cache)
+        client.get(url)
+        monkeypatch.setattr(blog.mixins, 'cache_page', real_cache_page)
+        assert title in client.get(url).content.decode(), (
+            f'Убедитесь, что страница `{url}` кешируется с версиями, '
+            'снятыми до чтения из БД: иначе запись во время рендеринга '
+            'оставит в кеше устаревшую страницу.'
+        )
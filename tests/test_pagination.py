@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user):
+    now = timezone.now()
+    category = mixer.blend('blog.Category', is_published=True)
+    # Половина постов с одинаковой датой: порядок решает id.
+    dates = (
+        now - timedelta(hours=index // 2)
+        for index in range(N_PER_PAGE * 2 + 5)
+    )
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        'blog.Post', author=user, category=category,
+        is_published=True, pub_date=dates)
+
+
+@override_settings(BLOG_PAGINATION_MODE='cursor')
+def test_cursor_pagination_walks_feed(client, feed_posts, PostModel):
+    expected = list(
+        PostModel.objects.order_by('-pub_date', '-id').values_list(
+            'id', flat=True)
+    )
+    seen = []
+    pages = []
+    cursor = ''
+    while True:
+        response = client.get('/', {'cursor': cursor} if cursor else {})
+        assert response.status_code == 200
+        page = response.context['page_obj']
+        pages.append(page)
+        seen.extend(post.id for post in page)
+        if not page.has_next():
+            break
+        cursor = page.next_cursor
+    assert seen == expected, (
+        'Убедитесь, что курсорная пагинация выдаёт все посты '
+        'без пропусков и повторов.'
+    )
+
+    response = client.get('/', {'cursor': pages[-1].previous_cursor})
+    assert [post.id for post in response.context['page_obj']] == [
+        post.id for post in pages[-2]
+    ], 'Убедитесь, что курсор «назад» возвращает предыдущую страницу.'
+
+
+@override_settings(BLOG_PAGINATION_MODE='cursor')
+def test_cursor_pagination_rejects_bad_cursor(client, feed_posts):
+    response = client.get('/', {'cursor': 'not-a-cursor'})
+    assert response.status_code == 404
+
+
+@pytest.fixture
+def many_pages_of_posts(mixer: Mixer, user):
+    category = mixer.blend('blog.Category', is_published=True)
+    now = timezone.now()
+    return mixer.cycle(N_PER_PAGE * 20).blend(
+        'blog.Post', author=user, category=category,
+        is_published=True, pub_date=now - timedelta(days=1))
+
+
+def test_paginator_renders_window_of_links(
+        client, many_pages_of_posts, django_assert_num_queries):
+    response = client.get('/', {'page': 10})
+    content = response.content.decode()
+    links = content.count('class="page-link"')
+    assert links < 15, (
+        'Убедитесь, что пагинатор выводит ограниченное окно ссылок '
+        'на страницы, а не все номера страниц.'
+    )
+    assert '?page=20' in content
+
+    with django_assert_num_queries(2):
+        # Размер ленты берётся из кеша: без COUNT(*).
+        # Второй запрос — валидаторы ETag страницы.
+        client.get('/', {'page': 2})
+
+
+def test_post_comments_are_paginated(mixer: Mixer, client):
+    from blog.views import COMMENTS_PER_PAGE
+
+    post = mixer.blend('blog.Post')
+    comments = mixer.cycle(COMMENTS_PER_PAGE + 5).blend(
+        'blog.Comment', post=post)
+    response = client.get(f'/posts/{post.id}/')
+    page = response.context['comments']
+    assert len(page) == COMMENTS_PER_PAGE, (
+        'Убедитесь, что на странице поста выводится ограниченное '
+        'число комментариев.'
+    )
+    assert page.has_next()
+    more_url = f'/posts/{post.id}/comments/?cursor={page.next_cursor}'
+    assert more_url in response.content.decode()
+
+    fragment = client.get(more_url)
+    assert fragment.status_code == 200
+    shown = [comment.id for comment in page] + [
+        comment.id for comment in fragment.context['comments']]
+    assert shown == [comment.id for comment in comments], (
+        'Убедитесь, что подгрузка комментариев продолжает список '
+        'без пропусков и повторов.'
+    )
+    assert '<html' not in fragment.content.decode()
+
+
+def test_comments_of_missing_post_are_not_found(mixer: Mixer, client):
+    post = mixer.blend('blog.Post')
+    mixer.blend('blog.Comment', post=post)
+    post_id = post.id
+    post.delete()
+    response = client.get(f'/posts/{post_id}/comments/')
+    assert response.status_code == 404, (
+        'Убедитесь, что подгрузка комментариев к несуществующему посту '
+        'возвращает 404, как и страница поста.'
+    )
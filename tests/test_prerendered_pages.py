@@ -0,0 +1,60 @@
+import pytest
+from django.test import override_settings
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures('prerendered_pages'),
+]
+
+
+@pytest.fixture
+def prerendered_pages():
+    from pages.prerendered import prerender
+
+    prerender.cache_clear()
+    with override_settings(PRERENDERED_PAGES=True):
+        yield
+    prerender.cache_clear()
+
+
+@pytest.mark.parametrize('url', ['/pages/about/', '/pages/rules/'])
+def test_static_pages_served_prerendered(
+        client, url, django_assert_num_queries):
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first['ETag']
+    assert etag.startswith('"'), (
+        f'Убедитесь, что страница `{url}` отдаётся со строгим ETag.'
+    )
+    assert 'max-age' in first['Cache-Control']
+    with django_assert_num_queries(0):
+        second = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert second.status_code == 304, (
+        f'Убедитесь, что страница `{url}` отвечает 304 на If-None-Match.'
+    )
+
+
+def test_prerendered_pages_keep_personal_header(user, user_client, client):
+    url = '/pages/about/'
+    anonymous = client.get(url).content.decode()
+    personal = user_client.get(url)
+    assert user.username not in anonymous
+    assert user.username in personal.content.decode(), (
+        'Убедитесь, что шапка заранее отрисованной страницы заполняется '
+        'под вошедшего пользователя.'
+    )
+    assert 'ETag' not in personal
+    assert 'text-white' in personal.content.decode(), (
+        'Убедитесь, что в заранее отрисованной странице выделен её пункт '
+        'меню.'
+    )
+
+
+def test_error_pages_served_prerendered(client):
+    from pages.views import server_error
+
+    response = client.get('/no/such/page/')
+    assert response.status_code == 404
+    assert 'max-age' not in response.get('Cache-Control', '')
+    request = client.get('/').wsgi_request
+    assert server_error(request).status_code == 500
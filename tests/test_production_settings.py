@@ -0,0 +1,62 @@
+import importlib
+import sys
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+MODULE = 'blogicum.settings_production'
+
+
+def load_production_settings():
+    sys.modules.pop(MODULE, None)
+    return importlib.import_module(MODULE)
+
+
+def test_production_settings(monkeypatch):
+    monkeypatch.setenv('DJANGO_SECRET_KEY', 'secret')
+    monkeypatch.setenv('DJANGO_ALLOWED_HOSTS', 'blogicum.ru, www.blogicum.ru')
+    monkeypatch.setenv(
+        'DJANGO_CACHE_LOCATION', '10.0.0.1:11211,10.0.0.2:11211'
+    )
+    monkeypatch.delenv('DJANGO_DEBUG', raising=False)
+    production = load_production_settings()
+    assert production.DEBUG is False
+    assert production.SECRET_KEY == 'secret'
+    assert production.ALLOWED_HOSTS == ['blogicum.ru', 'www.blogicum.ru']
+    assert production.DATABASES['default']['CONN_MAX_AGE'] > 0
+    assert production.DATABASES['default']['OPTIONS'] == {
+        'transaction_mode': 'IMMEDIATE'
+    }, (
+        'Убедитесь, что в боевых настройках транзакции SQLite сразу берут '
+        'блокировку записи.'
+    )
+    template_options = production.TEMPLATES[0]['OPTIONS']
+    assert template_options['loaders'][0][0] == (
+        'django.template.loaders.cached.Loader'), (
+        'Убедитесь, что в боевых настройках шаблоны загружаются '
+        'кеширующим загрузчиком.'
+    )
+    assert production.PRERENDERED_PAGES and (
+        production.BLOG_PAGE_CACHE_ENABLED)
+    assert production.CACHES['default']['LOCATION'] == [
+        '10.0.0.1:11211', '10.0.0.2:11211'
+    ]
+
+
+@pytest.mark.parametrize('env', [
+    {
+        'DJANGO_DEBUG': '1',
+        'DJANGO_SECRET_KEY': 'secret',
+        'DJANGO_CACHE_LOCATION': 'localhost:11211',
+    },
+    {'DJANGO_CACHE_LOCATION': 'localhost:11211'},
+    {'DJANGO_SECRET_KEY': 'secret'},
+])
+def test_production_settings_refuse_to_start(monkeypatch, env):
+    monkeypatch.delenv('DJANGO_SECRET_KEY', raising=False)
+    monkeypatch.delenv('DJANGO_CACHE_LOCATION', raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    with pytest.raises(ImproperlyConfigured):
+        load_production_settings()
+    sys.modules.pop(MODULE, None)
@@ -0,0 +1,134 @@
+import pytest
+from django.test import override_settings
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+
+@pytest.fixture
+def page_of_posts(mixer: Mixer):
+    category = mixer.blend('blog.Category', is_published=True)
+    return mixer.cycle(N_PER_PAGE).blend(
+        'blog.Post', category=category, is_published=True)
+
+
+@pytest.fixture
+def urls_vs_budgets(page_of_posts):
+    post = page_of_posts[0]
+    return {
+        '/': 2,
+        f'/category/{post.category.slug}/': 2,
+        f'/profile/{post.author.username}/': 3,
+        f'/posts/{post.id}/': 2,
+    }
+
+
+@override_settings(QUERY_BUDGET_ENFORCED=True)
+def test_pages_fit_query_budget(
+        user_client, urls_vs_budgets, django_assert_max_num_queries):
+    for url, budget in urls_vs_budgets.items():
+        # Сессия, пользователь, справочники и валидаторы ETag
+        # грузятся вне бюджета.
+        with django_assert_max_num_queries(budget + 6):
+            response = user_client.get(url)
+        assert response.status_code == 200, (
+            f'Убедитесь, что страница `{url}` укладывается '
+            f'в бюджет из {budget} запросов к БД.'
+        )
+
+
+@override_settings(QUERY_BUDGET_ENFORCED=True)
+def test_query_budget_exceeded(user_client, page_of_posts, monkeypatch):
+    from blog.mixins import QueryBudgetExceeded
+    from blog.views import IndexListView
+
+    monkeypatch.setattr(IndexListView, 'query_budget', 0)
+    with pytest.raises(QueryBudgetExceeded):
+        user_client.get('/')
+
+
+def test_edit_pages_load_object_once(mixer: Mixer, user, user_client):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    post = mixer.blend('blog.Post', author=user)
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    urls_vs_tables = {
+        f'/posts/{post.id}/edit/': 'blog_post',
+        f'/posts/{post.id}/delete/': 'blog_post',
+        f'/posts/{post.id}/edit_comment/{comment.id}/': 'blog_comment',
+        f'/posts/{post.id}/delete_comment/{comment.id}/': 'blog_comment',
+    }
+    for url, table in urls_vs_tables.items():
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(url)
+        assert response.status_code == 200
+        reads = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and f'FROM "{table}"' in query['sql']
+        ]
+        assert len(reads) == 1, (
+            f'Убедитесь, что страница `{url}` загружает объект '
+            'из БД один раз.'
+        )
+
+
+def test_feeds_take_dimensions_from_memory(client, urls_vs_budgets):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    for url in list(urls_vs_budgets)[:3]:
+        client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        for query in context.captured_queries:
+            assert 'blog_category' not in query['sql'] and (
+                'blog_location' not in query['sql']), (
+                f'Убедитесь, что страница `{url}` берёт категории '
+                'и местоположения из кеша справочников, без JOIN.'
+            )
+
+
+def test_dimensions_snapshot_expires(mixer, monkeypatch):
+    import blog.dimensions
+    from blog.dimensions import get_dimensions
+
+    category = mixer.blend('blog.Category', is_published=True)
+    assert category.pk in get_dimensions().published_category_ids
+    # Снимок перечитан до фиксации снятия с публикации: версия уже
+    # увеличена, а в памяти процесса осталась старая категория.
+    type(category).objects.filter(pk=category.pk).update(is_published=False)
+    assert category.pk in get_dimensions().published_category_ids
+    loaded_at = blog.dimensions._loaded['loaded_at']
+    monkeypatch.setattr(
+        blog.dimensions.time, 'monotonic', lambda: loaded_at + 60 * 60)
+    assert category.pk not in get_dimensions().published_category_ids, (
+        'Убедитесь, что снимок справочников перечитывается не реже, чем '
+        'раз в BLOG_DIMENSIONS_MAX_AGE секунд.'
+    )
+
+
+def test_dimensions_are_reset_after_commit(
+        mixer, django_capture_on_commit_callbacks):
+    from django.db import transaction
+
+    from blog.cache import get_versions
+    from blog.dimensions import DIMENSIONS_VERSION_KEY
+
+    category = mixer.blend('blog.Category', is_published=True)
+    before = get_versions([DIMENSIONS_VERSION_KEY])
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            category.is_published = False
+            category.save()
+            assert get_versions([DIMENSIONS_VERSION_KEY]) == before, (
+                'Убедитесь, что справочники сбрасываются только после '
+                'фиксации транзакции.'
+            )
+    assert get_versions([DIMENSIONS_VERSION_KEY]) != before
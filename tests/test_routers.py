@@ -0,0 +1,206 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, override_settings
+
+REPLICAS = ['replica_1', 'replica_2']
+
+
+@pytest.fixture
+def router():
+    from blog.routers import ReplicaRouter
+
+    return ReplicaRouter()
+
+
+@override_settings(BLOG_REPLICA_DATABASES=REPLICAS)
+def test_reads_go_to_replicas_writes_to_primary(router):
+    from blog.models import Comment, Post
+    from django.contrib.sessions.models import Session
+
+    for model in (Post, Comment):
+        assert router.db_for_read(model) in REPLICAS, (
+            'Убедитесь, что чтение постов и комментариев идёт с реплик.'
+        )
+        assert router.db_for_write(model) == 'default'
+    for model in (get_user_model(), Session):
+        assert router.db_for_read(model) == 'default', (
+            'Убедитесь, что пользователи и сессии читаются из основной БД.'
+        )
+    assert router.allow_migrate('replica_1', 'blog') is False
+
+
+def test_without_replicas_everything_uses_primary(router):
+    from blog.models import Post
+
+    assert router.db_for_read(Post) == 'default'
+
+
+@override_settings(BLOG_REPLICA_DATABASES=REPLICAS)
+def test_writes_pin_visitor_to_primary(router):
+    from blog.middleware import ReplicaStickinessMiddleware
+    from blog.models import Post
+
+    reads = []
+
+    def view(request):
+        from django.http import HttpResponse
+
+        reads.append(router.db_for_read(Post))
+        if request.method == 'POST':
+            router.db_for_write(Post)
+            reads.append(router.db_for_read(Post))
+        return HttpResponse()
+
+    middleware = ReplicaStickinessMiddleware(view)
+    factory = RequestFactory()
+
+    response = middleware(factory.get('/'))
+    assert reads.pop() in REPLICAS
+    assert 'use_primary' not in response.cookies
+
+    response = middleware(factory.post('/'))
+    assert reads == ['default', 'default'], (
+        'Убедитесь, что запрос на запись читает из основной БД.'
+    )
+    cookie = response.cookies['use_primary']
+    assert cookie['max-age'] == 10, (
+        'Убедитесь, что после записи посетитель закрепляется за основной '
+        'БД на BLOG_REPLICA_STICKY_SECONDS.'
+    )
+
+    reads.clear()
+    request = factory.get('/')
+    request.COOKIES['use_primary'] = cookie.value
+    middleware(request)
+    assert reads == ['default'], (
+        'Убедитесь, что после записи посетитель читает свои изменения '
+        'из основной БД.'
+    )
+    assert router.db_for_read(Post) in REPLICAS, (
+        'Убедитесь, что закрепление действует только в пределах запроса.'
+    )
+
+
+@pytest.mark.django_db
+def test_comment_sets_primary_cookie(user_client, mixer):
+    post = mixer.blend('blog.Post')
+    response = user_client.get(f'/posts/{post.id}/')
+    assert 'use_primary' not in response.cookies
+    response = user_client.post(
+        f'/posts/{post.id}/comment/', {'text': 'Комментарий'}
+    )
+    assert 'use_primary' in response.cookies, (
+        'Убедитесь, что после комментария посетитель закрепляется '
+        'за основной БД.'
+    )
+
+
+@override_settings(BLOG_REPLICA_DATABASES=REPLICAS)
+def test_cache_fills_read_from_primary(router):
+    from blog.models import Post
+    from blog.routers import (
+        begin_request,
+        end_request,
+        primary_reads,
+        read_from_replica,
+    )
+
+    with primary_reads():
+        assert router.db_for_read(Post) == 'default', (
+            'Убедитесь, что primary_reads() действует и вне HTTP-запроса.'
+        )
+    assert read_from_replica(), (
+        'Убедитесь, что вне primary_reads() чтение считается чтением '
+        'с реплики и не попадает в кеши.'
+    )
+    state, token = begin_request(pinned=False)
+    try:
+        with primary_reads():
+            assert router.db_for_read(Post) == 'default'
+        assert not read_from_replica()
+        assert router.db_for_read(Post) in REPLICAS
+        assert read_from_replica()
+    finally:
+        end_request(token)
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_REPLICA_DATABASES=REPLICAS)
+def test_cache_stores_skip_replica_reads(router, mixer):
+    from blog.cards import (
+        card_cache_stats,
+        render_post_cards,
+        reset_card_cache_stats,
+    )
+    from blog.pagecache import cache_page, get_cached_page
+    from blog.routers import begin_request, end_request
+
+    post = mixer.blend('blog.Post')
+    reset_card_cache_stats()
+    state, token = begin_request(pinned=False)
+    try:
+        router.db_for_read(type(post))
+        cache_page('blog:page:stale', 'страница с реплики', [])
+        render_post_cards([post])
+        render_post_cards([post])
+    finally:
+        end_request(token)
+    assert get_cached_page('blog:page:stale') is None, (
+        'Убедитесь, что прочитанное с реплики не сохраняется в кеш страниц.'
+    )
+    assert card_cache_stats() == {'hits': 0, 'misses': 2}, (
+        'Убедитесь, что карточки, прочитанные с реплики, не сохраняются '
+        'в кеш.'
+    )
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_REPLICA_DATABASES=REPLICAS)
+def test_replica_miss_is_confirmed_on_primary(mixer, monkeypatch):
+    from django.http import Http404
+
+    import blog.missing
+    from blog.missing import get_object_or_404_remembered, is_known_missing
+    from blog.models import Post
+    from blog.routers import pinned_to_primary
+
+    post = mixer.blend('blog.Post')
+    real_lookup = blog.missing.get_object_or_404
+
+    def stale_replica(klass, **lookup):
+        # Реплика ещё не получила пост.
+        if not pinned_to_primary():
+            raise Http404
+        return real_lookup(klass, **lookup)
+
+    monkeypatch.setattr(blog.missing, 'get_object_or_404', stale_replica)
+    assert get_object_or_404_remembered(
+        'post', post.pk, Post, pk=post.pk
+    ) == post, 'Убедитесь, что промах на реплике перепроверяется.'
+    assert not is_known_missing('post', post.pk), (
+        'Убедитесь, что промах на реплике не запоминается.'
+    )
+    with pytest.raises(Http404):
+        get_object_or_404_remembered('post', 987654, Post, pk=987654)
+    assert is_known_missing('post', 987654)
+
+
+@pytest.mark.django_db
+def test_refresh_replicas_resets_versions():
+    from io import StringIO
+
+    from django.core.management import call_command
+
+    from blog.cache import get_versions
+    from blog.cards import CARDS_VERSION_KEY
+    from blog.dimensions import DIMENSIONS_VERSION_KEY
+    from blog.pagecache import FEED_VERSION_KEY
+
+    keys = [FEED_VERSION_KEY, CARDS_VERSION_KEY, DIMENSIONS_VERSION_KEY]
+    before = get_versions(keys)
+    call_command('refresh_replicas', stdout=StringIO())
+    after = get_versions(keys)
+    assert all(after[key] != before[key] for key in keys), (
+        'Убедитесь, что refresh_replicas сбрасывает кеши, заполненные '
+        'до обновления реплик.'
+    )
@@ -0,0 +1,165 @@
+import datetime
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+
+@pytest.fixture
+def category(mixer: Mixer):
+    return mixer.blend('blog.Category', is_published=True)
+
+
+@pytest.fixture
+def make_post(mixer: Mixer, category):
+    def make_post(title, text, **kwargs):
+        kwargs.setdefault('category', category)
+        kwargs.setdefault('is_published', True)
+        kwargs.setdefault(
+            'pub_date', timezone.now() - datetime.timedelta(days=1))
+        return mixer.blend('blog.Post', title=title, text=text, **kwargs)
+    return make_post
+
+
+def search(client, query, **params):
+    response = client.get('/search/', {'q': query, **params})
+    assert response.status_code == 200
+    return response
+
+
+def found_titles(response):
+    return [post.title for post in response.context['object_list']]
+
+
+def test_parse_query_sanitizes_input():
+    from blog.search import FTS5Backend, parse_query
+
+    terms = parse_query('"горные озёра" поход* OR) NEAR(x "')
+    assert FTS5Backend.expression(terms) == (
+        '"горные озёра" "поход"* "OR" "NEAR x"'
+    ), 'Убедитесь, что синтаксис FTS5 из запроса не попадает в выражение.'
+    assert parse_query('  " * ') == []
+
+
+def test_search_phrase_prefix_and_ranking(client, make_post):
+    make_post('Заметки', 'Вчера мы ходили в поход к озеру.')
+    make_post('Поход к горным озёрам', 'Маршрут и снаряжение.')
+    make_post('Озёра', 'Горные озёра холодные даже летом.')
+
+    assert found_titles(search(client, 'поход'))[0] == (
+        'Поход к горным озёрам'), (
+        'Убедитесь, что совпадения в заголовке ранжируются выше.'
+    )
+    assert found_titles(search(client, '"горные озёра"')) == ['Озёра'], (
+        'Убедитесь, что поиск поддерживает точные фразы в кавычках.'
+    )
+    assert set(found_titles(search(client, 'гор*'))) == {
+        'Поход к горным озёрам', 'Озёра'
+    }, 'Убедитесь, что поиск поддерживает префиксы со звёздочкой.'
+
+
+def test_search_respects_visibility(client, make_post, mixer: Mixer):
+    make_post('Видимый туман', 'туман')
+    make_post('Снятый туман', 'туман', is_published=False)
+    make_post(
+        'Будущий туман', 'туман',
+        pub_date=timezone.now() + datetime.timedelta(days=1),
+    )
+    make_post(
+        'Туман в скрытой категории', 'туман',
+        category=mixer.blend('blog.Category', is_published=False),
+    )
+    assert found_titles(search(client, 'туман')) == ['Видимый туман'], (
+        'Убедитесь, что поиск показывает только посты, видимые в ленте.'
+    )
+
+
+def test_snippets_are_escaped_and_highlighted(client, make_post):
+    make_post('Разметка', 'Текст <script>alert(1)</script> про закат.')
+    content = search(client, 'закат').content.decode()
+    assert '<mark>закат</mark>' in content, (
+        'Убедитесь, что совпадения во фрагменте выделены тегом <mark>.'
+    )
+    assert '<script>alert(1)</script>' not in content, (
+        'Убедитесь, что фрагмент текста экранируется.'
+    )
+
+
+def test_index_follows_post_changes(client, make_post):
+    post = make_post('Черновик', 'первая версия')
+    post.text = 'вторая редакция'
+    post.save()
+    assert found_titles(search(client, 'первая')) == []
+    assert found_titles(search(client, 'редакция')) == ['Черновик']
+    post.delete()
+    assert found_titles(search(client, 'редакция')) == [], (
+        'Убедитесь, что удалённый пост пропадает из индекса.'
+    )
+
+
+def test_search_is_paginated(client, make_post):
+    from blog.views import POST_PER_PAGE
+
+    for number in range(POST_PER_PAGE + 3):
+        make_post(f'Пост {number}', 'ромашка')
+    response = search(client, 'ромашка')
+    assert len(response.context['object_list']) == POST_PER_PAGE
+    assert '?q=%D1%80%D0%BE%D0%BC%D0%B0%D1%88%D0%BA%D0%B0&amp;page=2' in (
+        response.content.decode()), (
+        'Убедитесь, что ссылки пагинатора сохраняют поисковый запрос.'
+    )
+    assert len(found_titles(search(client, 'ромашка', page=2))) == 3
+
+
+def test_reindex_command(client, make_post):
+    from django.db import connection
+
+    post = make_post('Потерянный', 'индекс')
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM blog_post_fts')
+        cursor.execute(
+            'INSERT INTO blog_post_fts (rowid, title, text) '
+            "VALUES (987654, 'сирота', 'сирота')"
+        )
+    call_command('reindex_search', batch_size=1, stdout=StringIO())
+    assert found_titles(search(client, 'индекс')) == [post.title], (
+        'Убедитесь, что команда reindex_search восстанавливает индекс.'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT count(*) FROM blog_post_fts')
+        assert cursor.fetchone()[0] == 1
+
+
+@override_settings(BLOG_SEARCH_BACKEND='blog.search.SimpleBackend')
+def test_simple_backend(client, make_post):
+    make_post('Закат', 'Красный закат над морем.')
+    response = search(client, 'закат')
+    assert found_titles(response) == ['Закат']
+    assert '<mark>закат</mark>' in response.content.decode()
+
+
+def test_count_skips_rank_and_snippets(client, make_post):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    make_post('Подсчёт', 'клевер')
+    with CaptureQueriesContext(connection) as queries:
+        response = search(client, 'клевер')
+    assert '<mark>клевер</mark>' in response.content.decode()
+    counts = [
+        query['sql'] for query in queries
+        if 'COUNT(' in query['sql'] and 'blog_post_fts' in query['sql']
+    ]
+    assert counts and not [
+        sql for sql in counts if 'snippet(' in sql or '"rank"' in sql
+    ], (
+        'Убедитесь, что подсчёт результатов поиска не вычисляет ранг '
+        'и фрагменты для каждого совпадения.'
+    )
@@ -0,0 +1,105 @@
+import pytest
+from django.db import connections
+from django.test import override_settings
+
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 1024 * 1024,
+    'busy_timeout': 1234,
+}
+
+
+@override_settings(BLOG_SQLITE_PRAGMAS=PRAGMAS)
+def test_new_connections_get_pragmas(tmp_path):
+    connection = connections['default']
+    wrapper = type(connection)({
+        **connection.settings_dict,
+        'NAME': str(tmp_path / 'db.sqlite3'),
+    })
+    try:
+        with wrapper.cursor() as cursor:
+            values = {}
+            for name in PRAGMAS:
+                cursor.execute(f'PRAGMA {name}')
+                values[name] = cursor.fetchone()[0]
+    finally:
+        wrapper.close()
+    assert values == {
+        'journal_mode': 'wal',
+        'synchronous': 1,
+        'mmap_size': 1024 * 1024,
+        'busy_timeout': 1234,
+    }, 'Убедитесь, что новые соединения с SQLite получают PRAGMA.'
+
+
+def test_writes_go_through_single_writer_lock(
+        tmp_path, user_client, mixer, monkeypatch):
+    from blog import db
+
+    lock_path = tmp_path / 'write-lock'
+    locked = []
+    single_writer = db.single_writer
+
+    def recording_single_writer(path=None):
+        locked.append(path)
+        return single_writer(path)
+
+    monkeypatch.setattr('blog.mixins.single_writer', recording_single_writer)
+    post = mixer.blend('blog.Post')
+    with override_settings(BLOG_SQLITE_WRITE_LOCK=str(lock_path)):
+        user_client.get(f'/posts/{post.id}/')
+        assert not locked, 'Убедитесь, что чтение не ждёт блокировку записи.'
+        response = user_client.post(
+            f'/posts/{post.id}/comment/', {'text': 'Комментарий'}
+        )
+    assert response.status_code == 302
+    assert locked and lock_path.exists(), (
+        'Убедитесь, что добавление комментария проходит через '
+        'блокировку записи.'
+    )
+
+
+def test_immediate_transactions_take_write_lock(tmp_path):
+    import sqlite3
+
+    from django.db import transaction
+
+    from blog.backends.sqlite3.base import DatabaseWrapper
+
+    path = tmp_path / 'db.sqlite3'
+    connections['immediate'] = DatabaseWrapper({
+        **connections['default'].settings_dict,
+        'NAME': str(path),
+        'OPTIONS': {'transaction_mode': 'immediate'},
+    }, 'immediate')
+    other = sqlite3.connect(path, timeout=0, isolation_level=None)
+    try:
+        with transaction.atomic(using='immediate'):
+            # Транзакция ещё ничего не записала, но блокировка уже взята.
+            with pytest.raises(sqlite3.OperationalError):
+                other.execute('BEGIN IMMEDIATE')
+        other.execute('BEGIN IMMEDIATE')
+        other.execute('COMMIT')
+    finally:
+        other.close()
+        connections['immediate'].close()
+        del connections['immediate']
+
+
+def test_unknown_transaction_mode_is_rejected(tmp_path):
+    from django.core.exceptions import ImproperlyConfigured
+
+    from blog.backends.sqlite3.base import DatabaseWrapper
+
+    wrapper = DatabaseWrapper({
+        **connections['default'].settings_dict,
+        'NAME': str(tmp_path / 'db.sqlite3'),
+        'OPTIONS': {'transaction_mode': 'later'},
+    })
+    with pytest.raises(ImproperlyConfigured):
+        wrapper.ensure_connection()
@@ -0,0 +1,95 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.template.defaultfilters import truncatewords
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+LONG_TEXT = ' '.join(f'слово{i}' for i in range(30))
+
+
+def test_excerpt_matches_truncatewords(mixer: Mixer, PostModel):
+    post = mixer.blend('blog.Post', text=LONG_TEXT)
+    assert post.excerpt == truncatewords(LONG_TEXT, 10), (
+        'Убедитесь, что при сохранении поста заполняется отрывок текста.'
+    )
+    PostModel.objects.filter(pk=post.pk).update(excerpt='')
+    call_command('backfill_excerpts', batch_size=1)
+    post.refresh_from_db()
+    assert post.excerpt == truncatewords(LONG_TEXT, 10), (
+        'Убедитесь, что команда `backfill_excerpts` заполняет отрывки.'
+    )
+
+
+def test_backfill_resets_cached_cards(mixer: Mixer, client, PostModel):
+    category = mixer.blend('blog.Category', is_published=True)
+    post = mixer.blend(
+        'blog.Post', text=LONG_TEXT, category=category, is_published=True)
+    PostModel.objects.filter(pk=post.pk).update(excerpt='')
+    assert post.excerpt not in client.get('/').content.decode()
+    call_command('backfill_excerpts')
+    assert post.excerpt in client.get('/').content.decode(), (
+        'Убедитесь, что после `backfill_excerpts` карточки и страницы, '
+        'закешированные с пустым отрывком, сбрасываются.'
+    )
+
+
+def test_feed_does_not_load_post_text(mixer: Mixer, client):
+    category = mixer.blend('blog.Category', is_published=True)
+    post = mixer.blend(
+        'blog.Post', text=LONG_TEXT, category=category, is_published=True)
+    with CaptureQueriesContext(connection) as context:
+        response = client.get('/')
+    assert post.excerpt in response.content.decode()
+    post_queries = [
+        query['sql'] for query in context.captured_queries
+        if 'FROM "blog_post"' in query['sql']
+    ]
+    assert post_queries and all(
+        '"blog_post"."text"' not in sql for sql in post_queries), (
+        'Убедитесь, что лента не загружает полный текст постов.'
+    )
+
+
+def test_text_html_is_stored_and_rerendered(
+        mixer: Mixer, PostModel, CommentModel):
+    from blog.rendering import RENDERER_VERSION
+
+    text = '<b>первая</b>\nвторая'
+    expected = '&lt;b&gt;первая&lt;/b&gt;<br>вторая'
+    post = mixer.blend('blog.Post', text=text)
+    comment = mixer.blend('blog.Comment', post=post, text=text)
+    for item in (post, comment):
+        assert item.text_html == expected, (
+            'Убедитесь, что при сохранении текст переводится '
+            'в экранированный HTML.'
+        )
+        assert item.text_html_version == RENDERER_VERSION
+
+    CommentModel.objects.update(text_html='', text_html_version=0)
+    comment.refresh_from_db()
+    assert comment.rendered_text == expected
+    call_command('rerender_texts', batch_size=1)
+    comment.refresh_from_db()
+    assert comment.text_html == expected, (
+        'Убедитесь, что команда `rerender_texts` перерисовывает '
+        'устаревший HTML.'
+    )
+
+
+def test_text_html_migrates_as_plain_text_field(PostModel):
+    field = PostModel._meta.get_field('text_html')
+    assert field.deconstruct()[1] == 'django.db.models.TextField', (
+        'Убедитесь, что миграции не зависят от класса поля из blog.models.'
+    )
+
+
+def test_updated_at_migrates_as_plain_datetime_field(CommentModel):
+    field = CommentModel._meta.get_field('updated_at')
+    assert field.deconstruct()[1] == 'django.db.models.DateTimeField', (
+        'Убедитесь, что миграции не зависят от класса поля из blog.models.'
+    )